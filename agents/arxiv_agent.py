@@ -6,24 +6,30 @@ import xml.etree.ElementTree as ET
 import time
 import json
 from .base_agent import Agent
+from .speculative_prefetch import SpeculativePrefetcher
+from .trend_merge_agent import CANDIDATE_OUTPUT_INSTRUCTIONS, parse_scout_output, scout_report
 from vertexai.generative_models import GenerativeModel
 
-class ArxivScoutAgent(Agent[str, str]):
+class ArxivScoutAgent(Agent[str, dict]):
     """
     Scans arXiv for recent research papers to identify early-stage scientific
     and technological breakthroughs based on a VC investment persona.
     """
-    def __init__(self, model: GenerativeModel):
+    def __init__(self, model: GenerativeModel, strategy_model: GenerativeModel = None):
         self.model = model
+        # The short query-generation prompt can be routed to a faster model.
+        self.strategy_model = strategy_model or model
+        self.prefetcher = SpeculativePrefetcher("ArxivScoutAgent")
 
-    def execute(self, vc_persona: str) -> str:
+    def execute(self, vc_persona: str) -> dict:
         """
         Runs the full pipeline: strategize -> collect -> analyze.
-        Returns a string report of the discovered research trends.
+        Returns a scout report: a text summary plus structured candidates for the discovered research trends.
         """
         print("[ArxivScoutAgent] Starting scan...")
         
         # Step 1: Generate a research discovery strategy.
+        # Last run's queries are prefetched while the strategy call is in flight.
         strategy_prompt = f"""
         Based on this VC Persona, generate a research discovery strategy with 5 diverse arXiv search queries (using categories like 'cat:cs.AI' or keywords).
         The goal is to find early, fundamental research signals that could lead to future startups.
@@ -32,24 +38,24 @@ class ArxivScoutAgent(Agent[str, str]):
 
         Return only the 5 search queries, one per line.
         """
-        strategy_response = self.model.generate_content(strategy_prompt)
-        queries = [q.strip() for q in strategy_response.text.strip().split('\n') if q.strip()]
+        def generate_queries():
+            strategy_response = self.strategy_model.generate_content(strategy_prompt)
+            queries = [q.strip() for q in strategy_response.text.strip().split('\n') if q.strip()]
+            return queries[:4] # Limit to 4 queries to keep runtime reasonable
+
+        # Step 2: Collect data from the arXiv API, reusing last run's results for matching queries.
+        queries, results = self.prefetcher.run(vc_persona, generate_queries, self._collect)
 
         if not queries:
             print("[ArxivScoutAgent] Could not generate a search strategy.")
-            return "No research trends found: failed to generate search strategy."
+            return scout_report("arxiv", "No research trends found: failed to generate search strategy.")
+
+        print(f"[ArxivScoutAgent] Executed strategy with queries: {queries}")
+        all_papers = [paper for query in queries for paper in results[query]]
 
-        # Step 2: Collect data from the arXiv API.
-        all_papers = []
-        print(f"[ArxivScoutAgent] Executing strategy with queries: {queries}")
-        for query in queries[:4]: # Limit to 4 queries to keep runtime reasonable
-            xml_data = self._search_arxiv(query, 150) # Fetch 150 papers per query
-            if xml_data:
-                all_papers.extend(self._parse_papers(xml_data))
-        
         if not all_papers:
             print("[ArxivScoutAgent] No papers found for the generated queries.")
-            return "No research trends found: API returned no papers."
+            return scout_report("arxiv", "No research trends found: API returned no papers.")
 
         # Step 3: Synthesize findings into a trend report.
         analysis_prompt = f"""
@@ -58,11 +64,19 @@ class ArxivScoutAgent(Agent[str, str]):
         Ignore well-known trends. Focus on what is truly new and foundational. For each, describe the research signal and its potential commercial application.
 
         Research Papers Data (Title and Date):
-        {json.dumps(all_papers[:300], indent=2)} 
+        {json.dumps(all_papers[:300], indent=2)}
+        {CANDIDATE_OUTPUT_INSTRUCTIONS}
         """
         analysis_response = self.model.generate_content(analysis_prompt)
         print("[ArxivScoutAgent] Scan complete.")
-        return analysis_response.text
+        return parse_scout_output("arxiv", analysis_response.text)
+
+    def _collect(self, query):
+        """Searches and parses the recent papers for a single query."""
+        xml_data = self._search_arxiv(query, 150) # Fetch 150 papers per query
+        if not xml_data:
+            return []
+        return self._parse_papers(xml_data)
 
     def _search_arxiv(self, query, max_results):
         """Helper function to call the arXiv API."""
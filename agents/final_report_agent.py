@@ -1,26 +1,27 @@
 # File: agents/final_report_agent.py
 
 import json
-from typing import List
 from .base_agent import Agent
 from vertexai.generative_models import GenerativeModel
 
-class FinalReportAgent(Agent[List[str], str]):
+class FinalReportAgent(Agent[dict, str]):
     """
-    This agent takes all the raw reports from the scouts and synthesizes them
+    This agent takes the merged, ranked trend candidates from the scouts and synthesizes them
     into the final, nested JSON structure required by the frontend.
     It combines synthesis, startup finding, and verification in one powerful step.
     """
     def __init__(self, model: GenerativeModel):
         self.model = model
 
-    def execute(self, raw_reports: List[str]) -> str:
+    def execute(self, merged_candidates: dict) -> str:
         print("[FinalReportAgent] Starting final synthesis for frontend...")
-        
-        combined_context = "\n\n---\n\n".join(raw_reports)
+
+        # Compact JSON: the candidates are already deduplicated, so no need to pad the prompt.
+        candidates_context = json.dumps(merged_candidates["candidates"], separators=(",", ":"), ensure_ascii=False)
+        fallback_context = "\n\n---\n\n".join(merged_candidates["fallback_reports"]) or "None."
         
         prompt = f"""
-        You are a world-class venture capital strategist responsible for creating the final investment report. You have received raw intelligence from your market news, open-source, and academic research divisions.
+        You are a world-class venture capital strategist responsible for creating the final investment report. You have received trend candidates from your market news, open-source, and academic research divisions. Overlapping candidates have already been merged and ranked.
 
         Your task is to synthesize all this information into a single, cohesive, and deeply nested JSON object that conforms to the exact schema required by our web application.
 
@@ -46,15 +47,20 @@ class FinalReportAgent(Agent[List[str], str]):
         - `rationale`: A brief explanation of why this startup is a key player in this subtrend.
 
         **YOUR TASK:**
-        1.  Analyze all the raw intelligence provided below.
-        2.  Identify the top 2-3 most powerful "meta-trends" that emerge from the combined data.
+        1.  Analyze the ranked trend candidates provided below. Each has the `sources` that reported it, a `corroboration` score (share of divisions that independently found it), a signal `strength` and supporting `evidence`.
+        2.  Identify the top 2-3 most powerful "meta-trends". Favour candidates with higher `score` and `corroboration`; combine related candidates into one meta-trend where it makes sense.
         3.  For each meta-trend, identify 2-3 specific "subtrends" or niches.
         4.  For each subtrend, find 2-3 real, early-stage startups from your knowledge base.
         5.  Construct the final JSON object strictly following the schema described above. Do not add any extra commentary outside the JSON structure.
 
-        **RAW INTELLIGENCE REPORTS:**
+        **RANKED TREND CANDIDATES (JSON, highest score first):**
+        ---
+        {candidates_context}
+        ---
+
+        **UNSTRUCTURED REPORTS (divisions that returned no candidates):**
         ---
-        {combined_context}
+        {fallback_context}
         ---
 
         Now, produce ONLY the final JSON object.
@@ -5,53 +5,55 @@ import requests
 import json
 from datetime import datetime, timedelta
 from .base_agent import Agent
+from .speculative_prefetch import SpeculativePrefetcher
+from .trend_merge_agent import CANDIDATE_OUTPUT_INSTRUCTIONS, parse_scout_output, scout_report
 from config import GITHUB_TOKEN
 from vertexai.generative_models import GenerativeModel
 
-class GithubScoutAgent(Agent[str, str]):
+class GithubScoutAgent(Agent[str, dict]):
     """
     Scans GitHub for new repositories gaining traction within a specific
     technical area of interest.
     """
-    def __init__(self, model: GenerativeModel):
+    def __init__(self, model: GenerativeModel, strategy_model: GenerativeModel = None):
         self.model = model
+        # The short query-generation prompt can be routed to a faster model.
+        self.strategy_model = strategy_model or model
+        self.prefetcher = SpeculativePrefetcher("GithubScoutAgent")
 
-    def execute(self, interest_area: str) -> str:
+    def execute(self, interest_area: str) -> dict:
         """
         Runs the full pipeline: strategize -> collect -> analyze.
-        Returns a string report of the discovered technical trends.
+        Returns a scout report: a text summary plus structured candidates for the discovered technical trends.
         """
         print("[GithubScoutAgent] Starting scan...")
 
         # Step 1: Generate a technical search strategy.
+        # Last run's queries are prefetched while the strategy call is in flight.
         strategy_prompt = f"""
         For the broad technical area of "{interest_area}", generate 5 specific and technical search queries for the GitHub API. 
         Focus on nascent technologies, new libraries, or emerging architectural patterns.
         
         Return only the 5 queries, one per line.
         """
-        strategy_response = self.model.generate_content(strategy_prompt)
-        queries = [q.strip() for q in strategy_response.text.strip().split('\n') if q.strip()]
+        def generate_queries():
+            strategy_response = self.strategy_model.generate_content(strategy_prompt)
+            return [q.strip() for q in strategy_response.text.strip().split('\n') if q.strip()]
+
+        # Step 2: Collect data from GitHub API, reusing last run's results for matching queries.
+        queries, results = self.prefetcher.run(interest_area, generate_queries, self._collect)
 
         if not queries:
             print("[GithubScoutAgent] Could not generate a search strategy.")
-            return "No GitHub trends found: failed to generate search strategy."
+            return scout_report("github", "No GitHub trends found: failed to generate search strategy.")
 
-        # Step 2: Collect data from GitHub API.
-        all_repos = []
-        print(f"[GithubScoutAgent] Executing strategy with queries: {queries}")
-        for query in queries:
-            raw_data, error = self._search_github(query, days_ago=90, min_stars=20)
-            if error:
-                print(f"[GithubScoutAgent] Error searching GitHub for '{query}': {error}")
-                continue
-            if raw_data:
-                all_repos.extend(self._parse_repos(raw_data))
+        print(f"[GithubScoutAgent] Executed strategy with queries: {queries}")
+        all_repos = [repo for query in queries for repo in results[query]]
 
         unique_repos = list({repo['name']: repo for repo in all_repos}.values())
         if not unique_repos:
             print("[GithubScoutAgent] No emerging repositories found for the generated queries.")
-            return "No emerging GitHub repositories found."
+            return scout_report("github", "No emerging GitHub repositories found.")
 
         # Step 3: Synthesize collected data into a trend report.
         analysis_prompt = f"""
@@ -62,10 +64,19 @@ class GithubScoutAgent(Agent[str, str]):
 
         Repository Data:
         {json.dumps(unique_repos, indent=2)}
+        {CANDIDATE_OUTPUT_INSTRUCTIONS}
         """
         analysis_response = self.model.generate_content(analysis_prompt)
         print("[GithubScoutAgent] Scan complete.")
-        return analysis_response.text
+        return parse_scout_output("github", analysis_response.text)
+
+    def _collect(self, query):
+        """Searches and parses the emerging repositories for a single query."""
+        raw_data, error = self._search_github(query, days_ago=90, min_stars=20)
+        if error:
+            print(f"[GithubScoutAgent] Error searching GitHub for '{query}': {error}")
+            return []
+        return self._parse_repos(raw_data)
 
     def _search_github(self, query, days_ago, min_stars):
         """Helper function to call the GitHub Search API."""
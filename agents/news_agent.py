@@ -5,25 +5,31 @@ import requests
 import json
 import time
 from .base_agent import Agent
+from .speculative_prefetch import SpeculativePrefetcher
+from .trend_merge_agent import CANDIDATE_OUTPUT_INSTRUCTIONS, parse_scout_output, scout_report
 from config import NEWS_API_KEY
 from vertexai.generative_models import GenerativeModel
 
-class NewsScoutAgent(Agent[str, str]):
+class NewsScoutAgent(Agent[str, dict]):
     """
     Scans news sources via NewsAPI to find high-level market trends
     based on a provided VC investment persona.
     """
-    def __init__(self, model: GenerativeModel):
+    def __init__(self, model: GenerativeModel, strategy_model: GenerativeModel = None):
         self.model = model
+        # The short query-generation prompt can be routed to a faster model.
+        self.strategy_model = strategy_model or model
+        self.prefetcher = SpeculativePrefetcher("NewsScoutAgent")
 
-    def execute(self, vc_persona: str) -> str:
+    def execute(self, vc_persona: str) -> dict:
         """
         Runs the full pipeline: strategize -> collect -> analyze.
-        Returns a string report of the discovered trends.
+        Returns a scout report: a text summary plus structured candidates for the discovered trends.
         """
         print("[NewsScoutAgent] Starting scan...")
         
         # Step 1: Generate a dynamic search strategy based on the VC persona.
+        # Last run's queries are prefetched while the strategy call is in flight.
         strategy_prompt = f"""
         Based on this VC Persona, generate 4 diverse, high-level news queries to scan for early signals of technological and economic shifts.
         Focus on creating queries that are precise and use boolean operators (AND, OR) to find high-signal results.
@@ -32,27 +38,23 @@ class NewsScoutAgent(Agent[str, str]):
 
         Return only the 4 search queries, one per line.
         """
-        strategy_response = self.model.generate_content(strategy_prompt)
-        queries = [q.strip() for q in strategy_response.text.strip().split('\n') if q.strip()]
-        
+        def generate_queries():
+            strategy_response = self.strategy_model.generate_content(strategy_prompt)
+            return [q.strip() for q in strategy_response.text.strip().split('\n') if q.strip()]
+
+        # Step 2: Collect data from NewsAPI, reusing last run's results for matching queries.
+        queries, results = self.prefetcher.run(vc_persona, generate_queries, self._collect)
+
         if not queries:
             print("[NewsScoutAgent] Could not generate a search strategy.")
-            return "No news signals found: failed to generate search strategy."
+            return scout_report("news", "No news signals found: failed to generate search strategy.")
+
+        print(f"[NewsScoutAgent] Executed strategy with queries: {queries}")
+        all_headlines = [headline for query in queries for headline in results[query]]
 
-        # Step 2: Collect data from NewsAPI using the generated strategy.
-        all_headlines = []
-        print(f"[NewsScoutAgent] Executing strategy with queries: {queries}")
-        for query in queries:
-            raw_data, error = self._fetch_news(query, 50) # Fetch 50 articles per query
-            if error:
-                print(f"[NewsScoutAgent] Error fetching news for '{query}': {error}")
-                continue
-            if raw_data:
-                all_headlines.extend(self._parse_articles(raw_data))
-        
         if not all_headlines:
             print("[NewsScoutAgent] No articles found for the generated queries.")
-            return "No news signals found: API returned no articles."
+            return scout_report("news", "No news signals found: API returned no articles.")
 
         # Step 3: Use the LLM to synthesize the collected headlines into a trend report.
         analysis_prompt = f"""
@@ -62,10 +64,19 @@ class NewsScoutAgent(Agent[str, str]):
 
         Headlines:
         {json.dumps(all_headlines, indent=2)}
+        {CANDIDATE_OUTPUT_INSTRUCTIONS}
         """
         analysis_response = self.model.generate_content(analysis_prompt)
         print("[NewsScoutAgent] Scan complete.")
-        return analysis_response.text
+        return parse_scout_output("news", analysis_response.text)
+
+    def _collect(self, query):
+        """Fetches and parses the headlines for a single query."""
+        raw_data, error = self._fetch_news(query, 50) # Fetch 50 articles per query
+        if error:
+            print(f"[NewsScoutAgent] Error fetching news for '{query}': {error}")
+            return []
+        return self._parse_articles(raw_data)
 
     def _fetch_news(self, query, page_size):
         """Helper function to call the NewsAPI."""
@@ -0,0 +1,160 @@
+# File: agents/speculative_prefetch.py
+# Overlaps a scout's strategy LLM call with speculative fetches of the queries it used last run.
+
+import difflib
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+from config import QUERY_HISTORY_PATH, SPECULATIVE_PREFETCH, SPECULATION_MATCH_THRESHOLD
+
+_history_lock = threading.Lock()
+
+# Boolean operators, +/- term modifiers and field prefixes, matched in normalized (lower-case) queries.
+_STRUCTURE_PATTERN = re.compile(r'\b(?:and|or|not|andnot)\b|(?<![\w-])[+-](?=[\w"])|\b[a-z_]+:')
+
+
+def normalize_query(query: str) -> str:
+    """Lower-cases a query and strips list numbering, bullets, quotes and extra whitespace."""
+    # A bullet needs a space after it; "-term" at the start is an exclusion, not a bullet.
+    query = re.sub(r"^\s*(?:\d+[.)]\s*|[-*•]\s+)", "", query)
+    query = query.strip().strip('"\'`').lower()
+    return re.sub(r"\s+", " ", query)
+
+
+def query_structure(normalized_query: str) -> Tuple[str, ...]:
+    """
+    The parts of a normalized query that change what it means rather than how it
+    is spelled: boolean operators, +/- term modifiers and field prefixes (cat:, all:, language:).
+    """
+    return tuple(match.group(0) for match in _STRUCTURE_PATTERN.finditer(normalized_query))
+
+
+def match_query(query: str, candidates: List[str], threshold: float = SPECULATION_MATCH_THRESHOLD) -> Optional[str]:
+    """
+    Returns the candidate that matches the query exactly or nearly, or None.
+    Near matches must have the same query_structure, so only the search terms may differ slightly.
+    """
+    normalized = normalize_query(query)
+    structure = query_structure(normalized)
+    best, best_ratio = None, 0.0
+    for candidate in candidates:
+        normalized_candidate = normalize_query(candidate)
+        if query_structure(normalized_candidate) != structure:
+            continue
+        ratio = difflib.SequenceMatcher(None, normalized, normalized_candidate).ratio()
+        if ratio > best_ratio:
+            best, best_ratio = candidate, ratio
+    return best if best_ratio >= threshold else None
+
+
+class SpeculativePrefetcher:
+    """
+    Remembers the queries each scout used per persona. On the next run it fetches
+    those queries in the background while the strategy call is in flight, reuses
+    the results for new queries that match, and only fetches the rest.
+    """
+    def __init__(self, agent_name: str, history_path: str = QUERY_HISTORY_PATH, enabled: bool = SPECULATIVE_PREFETCH):
+        self.agent_name = agent_name
+        self.history_path = history_path
+        self.enabled = enabled
+        self.last_stats = {}
+
+    def run(
+        self,
+        persona: str,
+        generate_queries: Callable[[], List[str]],
+        fetch: Callable[[str], list]
+    ) -> Tuple[List[str], Dict[str, list]]:
+        """
+        Generates the queries and collects results for each of them.
+        Returns the queries and a dict mapping each query to its fetched items.
+        """
+        key = f"{self.agent_name}:{hashlib.sha1(persona.encode('utf-8')).hexdigest()[:16]}"
+        entry = self._load_entry(key)
+        prior_queries = entry.get("queries", []) if self.enabled else []
+
+        # All fetches go through one worker thread, so requests to the data API stay
+        # sequential (as in a normal run) even though they overlap the strategy call.
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"{self.agent_name}-prefetch")
+        prefetches = {query: executor.submit(fetch, query) for query in prior_queries}
+        try:
+            queries = generate_queries()
+
+            # Pair each new query with at most one unused prior query.
+            matches = {}
+            remaining = list(prior_queries)
+            for query in queries:
+                prior = match_query(query, remaining)
+                if prior is not None:
+                    matches[query] = prior
+                    remaining.remove(prior)
+            for prior in remaining:
+                prefetches[prior].cancel()
+
+            # New queries are queued behind the matched prefetches on the same worker.
+            fetches = {query: executor.submit(fetch, query) for query in queries if query not in matches}
+            fetches.update({query: prefetches[prior] for query, prior in matches.items()})
+            results = {query: fetches[query].result() for query in queries}
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        if queries:
+            self._record(key, entry, queries, prior_queries, len(matches))
+        return queries, results
+
+    def _record(self, key: str, entry: dict, queries: List[str], prior_queries: List[str], hits: int):
+        """Stores this run's queries and prints/accumulates the speculation hit rate."""
+        totals = entry.get("totals", {"queries": 0, "hits": 0, "prefetched": 0})
+        if self.enabled:
+            totals["queries"] += len(queries)
+            totals["hits"] += hits
+            totals["prefetched"] += len(prior_queries)
+        self.last_stats = {
+            "queries": len(queries),
+            "prefetched": len(prior_queries),
+            "hits": hits,
+            "hit_rate": hits / len(queries),
+            "wasted_prefetches": len(prior_queries) - hits,
+            "cumulative_hit_rate": totals["hits"] / totals["queries"] if totals["queries"] else 0.0,
+        }
+        if self.enabled:
+            print(
+                f"[{self.agent_name}] Speculative prefetch: {hits}/{len(queries)} queries reused "
+                f"(hit rate {self.last_stats['hit_rate']:.0%}, cumulative {self.last_stats['cumulative_hit_rate']:.0%}, "
+                f"{self.last_stats['wasted_prefetches']} prefetches unused)"
+            )
+        self._save_entry(key, {"queries": queries, "totals": totals})
+
+    def _load_entry(self, key: str) -> dict:
+        with _history_lock:
+            return self._read_history().get(key, {})
+
+    def _save_entry(self, key: str, entry: dict):
+        with _history_lock:
+            history = self._read_history()
+            history[key] = entry
+            tmp_path = None
+            try:
+                # A unique temp file per writer, so concurrent processes never write to the same one.
+                fd, tmp_path = tempfile.mkstemp(
+                    dir=os.path.dirname(os.path.abspath(self.history_path)), suffix=".tmp"
+                )
+                with os.fdopen(fd, "w") as f:
+                    json.dump(history, f, indent=2)
+                os.replace(tmp_path, self.history_path)
+            except OSError as e:
+                print(f"[{self.agent_name}] Could not save query history: {e}")
+                if tmp_path and os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+
+    def _read_history(self) -> dict:
+        try:
+            with open(self.history_path) as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return {}
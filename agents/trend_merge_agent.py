@@ -0,0 +1,170 @@
+# File: agents/trend_merge_agent.py
+# This agent merges overlapping trend candidates from the scouts before the final synthesis.
+
+import json
+import re
+from typing import List
+import numpy as np
+from .base_agent import Agent
+from config import MERGE_SIMILARITY_THRESHOLD, MAX_MERGED_CANDIDATES
+
+# Appended to every scout's analysis prompt so the scouts return structured candidates.
+CANDIDATE_OUTPUT_INSTRUCTIONS = """
+        Return ONLY a JSON object with two keys:
+        - "summary": your analysis as free text, as you would write it for a colleague.
+        - "trends": a list of trend candidates. Each candidate has "name" (short string), "description" (one sentence),
+          "evidence" (a list of up to 5 of the exact items above that support it) and "strength" (integer 1-10, how strong the signal is).
+"""
+
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "based", "by", "for", "from", "in", "into", "is", "it", "its",
+    "new", "of", "on", "or", "the", "their", "this", "to", "using", "via", "with",
+}
+
+
+def scout_report(source: str, summary: str, candidates: list = None) -> dict:
+    """The structured output every scout returns."""
+    return {"source": source, "summary": summary, "candidates": candidates or []}
+
+
+def parse_scout_output(source: str, response_text: str) -> dict:
+    """
+    Parses a scout's JSON answer into a scout report. If the model did not return
+    valid JSON, the raw text is kept as the summary and no candidates are emitted.
+    """
+    cleaned_text = response_text.strip().replace("```json", "").replace("```", "")
+    try:
+        parsed = json.loads(cleaned_text)
+    except json.JSONDecodeError:
+        print(f"[TrendMergeAgent] Warning: {source} scout did not return valid JSON. Using its text only.")
+        return scout_report(source, response_text)
+    if not isinstance(parsed, dict):
+        return scout_report(source, response_text)
+
+    candidates = []
+    for item in parsed.get("trends") or []:
+        if not isinstance(item, dict) or not str(item.get("name", "")).strip():
+            continue
+        try:
+            strength = min(10, max(1, int(item.get("strength", 5))))
+        except (TypeError, ValueError):
+            strength = 5
+        evidence = item.get("evidence") or []
+        if not isinstance(evidence, list):
+            evidence = [evidence]
+        candidates.append({
+            "name": str(item["name"]).strip(),
+            "description": str(item.get("description", "")).strip(),
+            "evidence": [str(e).strip() for e in evidence if str(e).strip()],
+            "strength": strength,
+            "source": source,
+        })
+    return scout_report(source, str(parsed.get("summary", "")).strip(), candidates)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lower-cased word tokens without stopwords; plurals are folded so 'labs' matches 'lab'."""
+    tokens = []
+    for token in re.findall(r"[a-z0-9]+", text.lower()):
+        if token in STOPWORDS or len(token) < 2:
+            continue
+        if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+            token = token[:-1]
+        tokens.append(token)
+    return tokens
+
+
+def tfidf_matrix(texts: List[str]) -> np.ndarray:
+    """Builds L2-normalized TF-IDF vectors (one row per text)."""
+    tokenized = [tokenize(text) for text in texts]
+    vocabulary = {token: i for i, token in enumerate(sorted({t for tokens in tokenized for t in tokens}))}
+    counts = np.zeros((len(texts), max(1, len(vocabulary))))
+    for row, tokens in enumerate(tokenized):
+        for token in tokens:
+            counts[row, vocabulary[token]] += 1
+
+    document_frequency = (counts > 0).sum(axis=0)
+    idf = np.log((1 + len(texts)) / (1 + document_frequency)) + 1
+    vectors = np.log1p(counts) * idf
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms == 0, 1, norms)
+
+
+class TrendMergeAgent(Agent[List[dict], dict]):
+    """
+    Matches trend candidates from different scouts by text similarity (TF-IDF
+    cosine), merges each group into one candidate and ranks the result by
+    cross-source corroboration and signal strength. Runs locally, no LLM call.
+    """
+    def __init__(self, similarity_threshold: float = MERGE_SIMILARITY_THRESHOLD, max_candidates: int = MAX_MERGED_CANDIDATES):
+        self.similarity_threshold = similarity_threshold
+        self.max_candidates = max_candidates
+
+    def execute(self, scout_reports: List[dict]) -> dict:
+        """
+        Returns {"candidates": [...ranked merged candidates...], "fallback_reports": [...]},
+        where fallback_reports holds the summaries of scouts that produced no candidates.
+        """
+        print("[TrendMergeAgent] Merging trend candidates across scouts...")
+        candidates = [c for report in scout_reports for c in report["candidates"]]
+        fallback_reports = [report["summary"] for report in scout_reports if not report["candidates"] and report["summary"]]
+        if not candidates:
+            print("[TrendMergeAgent] No structured candidates received.")
+            return {"candidates": [], "fallback_reports": fallback_reports}
+
+        # The name is repeated so it weighs more than the (longer) evidence list.
+        texts = [" ".join([c["name"], c["name"], c["description"]] + c["evidence"]) for c in candidates]
+        vectors = tfidf_matrix(texts)
+        similarity = vectors @ vectors.T
+
+        # Single-linkage grouping of every pair above the threshold (union-find).
+        parent = list(range(len(candidates)))
+
+        def find(i):
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        rows, cols = np.where(np.triu(similarity, k=1) >= self.similarity_threshold)
+        for i, j in zip(rows.tolist(), cols.tolist()):
+            parent[find(i)] = find(j)
+
+        groups = {}
+        for i in range(len(candidates)):
+            groups.setdefault(find(i), []).append(candidates[i])
+
+        # Corroboration is measured against every scout that ran, not just those that returned candidates,
+        # so a trend reported by the only responsive scout does not count as fully corroborated.
+        merged = [self._merge(group, len(scout_reports)) for group in groups.values()]
+        merged.sort(key=lambda c: (-c["score"], -c["corroboration"], -c["strength"], c["name"]))
+        merged = merged[:self.max_candidates]
+
+        corroborated = sum(1 for c in merged if len(c["sources"]) > 1)
+        print(f"[TrendMergeAgent] {len(candidates)} candidates merged into {len(groups)} "
+              f"({corroborated} corroborated by more than one source).")
+        return {"candidates": merged, "fallback_reports": fallback_reports}
+
+    @staticmethod
+    def _merge(group: List[dict], source_count: int) -> dict:
+        """Combines a group of matched candidates into one, led by its strongest member."""
+        lead = max(group, key=lambda c: (c["strength"], len(c["evidence"])))
+        sources = sorted({c["source"] for c in group})
+        evidence, seen = [], set()
+        for candidate in sorted(group, key=lambda c: -c["strength"]):
+            for item in candidate["evidence"]:
+                if item.lower() not in seen:
+                    seen.add(item.lower())
+                    evidence.append(f"[{candidate['source']}] {item}")
+        corroboration = len(sources) / source_count
+        strength = max(c["strength"] for c in group)
+        return {
+            "name": lead["name"],
+            "description": lead["description"],
+            "also_known_as": sorted({c["name"] for c in group} - {lead["name"]}),
+            "sources": sources,
+            "evidence": evidence[:8],
+            "strength": strength,
+            "corroboration": round(corroboration, 2),
+            "score": round(0.5 * corroboration + 0.5 * strength / 10, 3),
+        }
@@ -1,18 +1,16 @@
 # api.py (Corrected)
 import os
-from fastapi import FastAPI, HTTPException, Security
+from fastapi import Depends, FastAPI, HTTPException, Security
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import APIKeyHeader
 from google.cloud import firestore
 import vertexai
-from vertexai.generative_models import GenerativeModel
-
-# Import the agents you ACTUALLY use in the final orchestrator
-from agents.news_agent import NewsScoutAgent
-from agents.github_agent import GithubScoutAgent
-from agents.arxiv_agent import ArxivScoutAgent
-from agents.final_report_agent import FinalReportAgent # <-- IMPORTANT
-from orchestrator import Orchestrator
+
+from main import build_orchestrator
+from job_queue import JobQueue
+from report_store import ReportStore
+from worker import SCHEDULED_ANALYSIS
+from model_router import ModelRouter
 from config import PROJECT_ID, LOCATION
 
 # --- API & Security Setup ---
@@ -50,25 +48,31 @@ async def get_api_key(api_key: str = Security(api_key_header)):
     else:
         raise HTTPException(status_code=403, detail="Could not validate credentials")
 
+# Admin-only features (e.g. profiling) need a separate key; they are disabled when it is not set
+ADMIN_API_KEY = os.environ.get("ADMIN_API_KEY")
+ADMIN_API_KEY_NAME = "X-ADMIN-KEY"
+admin_key_header = APIKeyHeader(name=ADMIN_API_KEY_NAME, auto_error=False)
+
+async def get_profile_flag(profile: bool = False, admin_key: str = Security(admin_key_header)):
+    if profile and (not ADMIN_API_KEY or admin_key != ADMIN_API_KEY):
+        raise HTTPException(status_code=403, detail="Profiling requires a valid admin key")
+    return profile
+
 # --- Global Initialization ---
 
 print("Initializing Vertex AI system...")
 vertexai.init(project=PROJECT_ID, location=LOCATION)
-gemini_model = GenerativeModel("gemini-1.5-pro-001") # Use 1.5 Pro for best results
+# Each stage gets its own model: fast models for strategy/scouting, pro for the final report
+model_router = ModelRouter()
 print("Vertex AI system initialized.")
-# Add the Firestore client
-db = firestore.Client() 
+# Scheduled runs are handed to the worker processes through this queue
+job_queue = JobQueue()
+# Reports are stored per trend in Firestore; clients can fetch only what they need
+report_store = ReportStore(firestore.Client())
 print("Systems initialized.")
 
 # Instantiate all agents once to be reused across requests
-# THIS IS THE CORRECTED BLOCK
-orchestrator = Orchestrator(
-    news_scout=NewsScoutAgent(model=gemini_model),
-    github_scout=GithubScoutAgent(model=gemini_model),
-    arxiv_scout=ArxivScoutAgent(model=gemini_model),
-    # The key change: Pass the FinalReportAgent with the correct keyword 'final_report_agent'
-    final_report_agent=FinalReportAgent(model=gemini_model)
-)
+orchestrator = build_orchestrator(model_router)
 
 # --- API Endpoints ---
 
@@ -78,45 +82,96 @@ async def root():
 
 
 @app.post("/analyze", tags=["Analysis"], dependencies=[Security(get_api_key)])
-async def run_analysis():
+async def run_analysis(profile: bool = Depends(get_profile_flag)):
     """
     Triggers the full, end-to-end trend analysis pipeline.
+    Admins can pass ?profile=true to write profiling reports next to the run's report.
     """
     try:
         print("Received request to /analyze. Starting orchestrator...")
-        final_report = orchestrator.run()
+        final_report = orchestrator.run(profile=profile)
         # The report is already a JSON string, so we return it directly
         return {"report": final_report}
     except Exception as e:
         print(f"An error occurred during analysis: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/model-stats", tags=["Monitoring"], dependencies=[Security(get_api_key)])
+async def model_stats():
+    """
+    Returns per-stage model latency and token usage since the service started.
+    Only covers runs inside this API process (/analyze); scheduled runs execute in
+    worker.py processes, which have their own router and print their stats per job.
+    """
+    return {"models": list(model_router.stats().values())}
+
 # ADD THIS NEW ENDPOINT FOR THE SCHEDULER
-@app.post("/run-scheduled-analysis", tags=["Scheduled Tasks"])
-async def run_scheduled_analysis(api_key: str = Security(get_api_key)):
+@app.post("/run-scheduled-analysis", tags=["Scheduled Tasks"], status_code=202)
+def run_scheduled_analysis(api_key: str = Security(get_api_key), profile: bool = Depends(get_profile_flag)):
     """
     A secure endpoint for Cloud Scheduler to trigger.
-    Runs the full analysis and saves the result to Firestore.
+    Enqueues a full analysis run; worker.py runs it and saves the result to Firestore.
+    Admins can pass ?profile=true to have the worker profile the run.
     """
     try:
-        print("Received scheduled task. Starting orchestrator...")
-        final_report_json_str = orchestrator.run()
-        
-        print("Saving report to Firestore...")
-        # Get a reference to the document where we'll store the report
-        # Using a fixed ID 'latest' makes it easy for the frontend to find
-        doc_ref = db.collection("reports").document("latest")
-
-        # The report is a string, so we store it in a field.
-        # We also add a timestamp.
-        doc_ref.set({
-            "report_json": final_report_json_str,
-            "last_updated": firestore.SERVER_TIMESTAMP
-        })
-        print("Successfully saved report to Firestore.")
-        
-        return {"status": "ok", "message": "Report updated in Firestore."}
+        job_id = job_queue.enqueue(SCHEDULED_ANALYSIS, {"profile": profile})
+        print(f"Received scheduled task. Enqueued job {job_id}.")
+        return {"status": "queued", "job_id": job_id}
 
     except Exception as e:
-        print(f"An error occurred during scheduled analysis: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        print(f"An error occurred while enqueueing scheduled analysis: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/jobs/{job_id}", tags=["Scheduled Tasks"], dependencies=[Security(get_api_key)])
+def get_job(job_id: str):
+    """
+    Returns the status of a queued analysis job. A finished job's result has a
+    "persistence" entry for its report: "pending" while the background Firestore
+    write is in flight, then "saved" (or "superseded" if a newer report was saved
+    first), or "discarded" if the report could not be stored.
+    """
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    response = {key: job[key] for key in ("id", "kind", "status", "attempts", "max_attempts", "error", "result")}
+    if job["status"] == "succeeded" and job["result"] and "persistence" in job["result"]:
+        response["result"] = dict(
+            job["result"],
+            persistence=report_store.resolve_persistence(job["result"]["persistence"], job["updated_at"])
+        )
+    return response
+
+
+@app.get("/reports/latest", tags=["Reports"], dependencies=[Security(get_api_key)])
+def get_latest_report():
+    """
+    Returns the full latest report, reassembled from its per-trend documents.
+    """
+    report = report_store.load()
+    if report is None:
+        raise HTTPException(status_code=404, detail="No report has been saved yet")
+    return report
+
+
+@app.get("/reports/latest/index", tags=["Reports"], dependencies=[Security(get_api_key)])
+def get_latest_report_index():
+    """
+    Returns the trend ids, names and content hashes of the latest report, so
+    clients can re-fetch only the trends whose hash changed.
+    """
+    index = report_store.load_index()
+    if index is None:
+        raise HTTPException(status_code=404, detail="No report has been saved yet")
+    return {key: index.get(key) for key in ("trend_ids", "trend_hashes", "trends", "report_hash", "last_updated")}
+
+
+@app.get("/reports/latest/trends/{trend_id}", tags=["Reports"], dependencies=[Security(get_api_key)])
+def get_latest_trend(trend_id: str):
+    """
+    Returns a single trend of the latest report.
+    """
+    trend = report_store.load_trend(trend_id)
+    if trend is None:
+        raise HTTPException(status_code=404, detail="Trend not found")
+    return trend
@@ -25,4 +25,70 @@ intersections of software (AI/ML), biology, and advanced materials.
 """
 
 # Technical Area of Interest for GitHub agent
-GITHUB_INTEREST_AREA = "The emerging stack for building and deploying autonomous AI Agents"
\ No newline at end of file
+GITHUB_INTEREST_AREA = "The emerging stack for building and deploying autonomous AI Agents"
+
+# --- Model Routing ---
+
+# Each pipeline stage gets its own model and generation config. The short
+# strategy prompts only return a handful of search queries, so they go to a
+# fast model; the final synthesis keeps the pro model.
+# On 2.5 models thinking tokens count against max_output_tokens, so the limits leave
+# room for them; a response cut off before any text makes `response.text` raise.
+MODEL_ROUTING = {
+    "strategy": {
+        "model": "gemini-2.5-flash",
+        "temperature": 0.8,
+        "top_p": 0.95,
+        "max_output_tokens": 2048,
+    },
+    "scout_analysis": {
+        "model": "gemini-2.5-flash",
+        "temperature": 0.6,
+        "top_p": 0.95,
+        "max_output_tokens": 8192,
+    },
+    "final_synthesis": {
+        "model": "gemini-2.5-pro",
+        "temperature": 0.6,
+        "top_p": 0.95,
+        "max_output_tokens": 8192,
+    },
+}
+
+# --- Speculative Prefetch ---
+
+# While a scout's strategy call is in flight, re-fetch the queries it used on the
+# previous run for the same persona and reuse the results for matching queries.
+SPECULATIVE_PREFETCH = os.getenv("SPECULATIVE_PREFETCH", "true").lower() == "true"
+# Where each scout's last queries and hit-rate totals are stored between runs.
+QUERY_HISTORY_PATH = os.getenv("QUERY_HISTORY_PATH", "query_history.json")
+# Minimum similarity (0-1) for a new query to reuse a prefetched one.
+SPECULATION_MATCH_THRESHOLD = 0.9
+
+# --- Job Queue ---
+
+# Scheduled analysis runs are enqueued by the API and executed by worker.py.
+# The API and the workers must use the same file (same container or a shared volume; see entrypoint.sh).
+JOB_QUEUE_PATH = os.getenv("JOB_QUEUE_PATH", "jobs.sqlite3")
+# A running job must heartbeat within this window or another worker may reclaim it.
+JOB_LEASE_SECONDS = int(os.getenv("JOB_LEASE_SECONDS", "300"))
+# Attempts before a job is marked as failed; retries back off exponentially.
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+JOB_RETRY_BACKOFF_SECONDS = int(os.getenv("JOB_RETRY_BACKOFF_SECONDS", "30"))
+# Upper bound on jobs running at the same time across all workers sharing the queue.
+JOB_MAX_CONCURRENCY = int(os.getenv("JOB_MAX_CONCURRENCY", "2"))
+# Number of worker processes started by worker.py.
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+
+# --- Report Persistence ---
+
+# Reports are written to Firestore in the background; until a write succeeds the
+# report is kept in this local file so it survives a worker restart.
+REPORT_SPOOL_PATH = os.getenv("REPORT_SPOOL_PATH", "pending_report.json")
+
+# --- Trend Merging ---
+
+# Minimum TF-IDF cosine similarity for two scout trend candidates to be merged.
+MERGE_SIMILARITY_THRESHOLD = 0.3
+# How many merged candidates are passed on to the final report.
+MAX_MERGED_CANDIDATES = 12
@@ -0,0 +1,39 @@
+#!/bin/sh
+# entrypoint.sh
+# Starts one role of the service. The role is the first argument or the ROLE variable:
+#
+#   api     The FastAPI service only (default).
+#   worker  The queue worker pool only: python worker.py --workers $JOB_WORKERS.
+#   all     Both in one container. Opt-in, for single-instance deployments only.
+#
+# Jobs are queued in a SQLite file (JOB_QUEUE_PATH) that the API and the workers must share:
+# - api + worker: run both containers on one host (or pod) with the same volume mounted at
+#   JOB_QUEUE_PATH. The volume needs working file locks (a local disk, not NFS or a bucket),
+#   and every API replica must see the same file or /jobs/{id} returns 404 for jobs it did not enqueue.
+# - all: the queue lives inside the container. On Cloud Run this needs always-on CPU
+#   (no throttling after the 202 response), min-instances=1 and max-instances=1, and
+#   queued jobs are lost when the instance is replaced unless JOB_QUEUE_PATH is on a persistent volume.
+
+set -e
+
+ROLE="${1:-${ROLE:-api}}"
+WORKERS="${JOB_WORKERS:-2}"
+
+# 0.0.0.0 is crucial to allow connections from outside the container.
+# The port must match the EXPOSE instruction.
+case "$ROLE" in
+    api)
+        exec uvicorn api:app --host 0.0.0.0 --port 8080
+        ;;
+    worker)
+        exec python worker.py --workers "$WORKERS"
+        ;;
+    all)
+        python worker.py --workers "$WORKERS" &
+        exec uvicorn api:app --host 0.0.0.0 --port 8080
+        ;;
+    *)
+        echo "Unknown role '$ROLE'. Use api, worker or all." >&2
+        exit 1
+        ;;
+esac
@@ -0,0 +1,195 @@
+# job_queue.py
+# A durable, SQLite-backed job queue with leases and retries, shared by the API and worker processes.
+
+import json
+import sqlite3
+import time
+import uuid
+from contextlib import contextmanager
+from config import (
+    JOB_QUEUE_PATH,
+    JOB_LEASE_SECONDS,
+    JOB_MAX_ATTEMPTS,
+    JOB_RETRY_BACKOFF_SECONDS,
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    lease_owner TEXT,
+    lease_expires REAL,
+    available_at REAL NOT NULL,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    result TEXT,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_status_available ON jobs (status, available_at);
+"""
+
+
+class JobQueue:
+    """
+    Jobs move through queued -> running -> succeeded/failed. A worker holds a
+    lease on a running job and must renew it with heartbeat(); if the worker
+    dies, the lease expires and the job is requeued until max_attempts is hit.
+    """
+    def __init__(
+        self,
+        path: str = JOB_QUEUE_PATH,
+        lease_seconds: int = JOB_LEASE_SECONDS,
+        max_attempts: int = JOB_MAX_ATTEMPTS,
+        retry_backoff_seconds: int = JOB_RETRY_BACKOFF_SECONDS
+    ):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.retry_backoff_seconds = retry_backoff_seconds
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        # Autocommit mode; multi-statement updates use explicit BEGIN IMMEDIATE transactions.
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def enqueue(self, kind: str, payload: dict = None) -> str:
+        """Adds a job to the queue and returns its id."""
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO jobs (id, kind, payload, status, max_attempts, available_at, created_at, updated_at) "
+                "VALUES (?, ?, ?, 'queued', ?, ?, ?, ?)",
+                (job_id, kind, json.dumps(payload or {}), self.max_attempts, now, now, now)
+            )
+        return job_id
+
+    def lease(self, worker_id: str, max_running: int = None) -> dict:
+        """
+        Claims the oldest available job for this worker, or returns None if there
+        is nothing to do or max_running jobs are already in progress.
+        """
+        now = time.time()
+        with self._connect() as conn:
+            try:
+                conn.execute("BEGIN IMMEDIATE")
+                self._reclaim_expired(conn, now)
+
+                if max_running is not None:
+                    running = conn.execute("SELECT COUNT(*) FROM jobs WHERE status = 'running'").fetchone()[0]
+                    if running >= max_running:
+                        conn.execute("COMMIT")
+                        return None
+
+                row = conn.execute(
+                    "SELECT id FROM jobs WHERE status = 'queued' AND available_at <= ? "
+                    "ORDER BY available_at, created_at LIMIT 1",
+                    (now,)
+                ).fetchone()
+                if row is None:
+                    conn.execute("COMMIT")
+                    return None
+
+                conn.execute(
+                    "UPDATE jobs SET status = 'running', attempts = attempts + 1, lease_owner = ?, "
+                    "lease_expires = ?, updated_at = ? WHERE id = ?",
+                    (worker_id, now + self.lease_seconds, now, row["id"])
+                )
+                job = self._fetch(conn, row["id"])
+                conn.execute("COMMIT")
+                return job
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+    def heartbeat(self, job_id: str, worker_id: str) -> bool:
+        """Extends the lease on a running job. Returns False if the lease was lost."""
+        now = time.time()
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET lease_expires = ?, updated_at = ? "
+                "WHERE id = ? AND status = 'running' AND lease_owner = ?",
+                (now + self.lease_seconds, now, job_id, worker_id)
+            )
+            return cursor.rowcount == 1
+
+    def complete(self, job_id: str, worker_id: str, result: dict = None) -> bool:
+        """Marks a job as succeeded. Returns False if the lease was lost."""
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET status = 'succeeded', result = ?, error = NULL, lease_owner = NULL, "
+                "lease_expires = NULL, updated_at = ? WHERE id = ? AND status = 'running' AND lease_owner = ?",
+                (json.dumps(result or {}), time.time(), job_id, worker_id)
+            )
+            return cursor.rowcount == 1
+
+    def fail(self, job_id: str, worker_id: str, error: str) -> bool:
+        """Records a failed attempt; the job is retried with backoff until max_attempts is reached."""
+        now = time.time()
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT attempts, max_attempts FROM jobs WHERE id = ? AND status = 'running' AND lease_owner = ?",
+                (job_id, worker_id)
+            ).fetchone()
+            if row is None:
+                return False
+            if row["attempts"] < row["max_attempts"]:
+                status, available_at = "queued", now + self._backoff(row["attempts"])
+            else:
+                status, available_at = "failed", now
+            cursor = conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, available_at = ?, lease_owner = NULL, "
+                "lease_expires = NULL, updated_at = ? WHERE id = ? AND status = 'running' AND lease_owner = ?",
+                (status, error, available_at, now, job_id, worker_id)
+            )
+            return cursor.rowcount == 1
+
+    def get(self, job_id: str) -> dict:
+        """Returns a job by id, or None if it does not exist."""
+        with self._connect() as conn:
+            return self._fetch(conn, job_id)
+
+    def counts(self) -> dict:
+        """Returns the number of jobs in each status."""
+        with self._connect() as conn:
+            rows = conn.execute("SELECT status, COUNT(*) AS n FROM jobs GROUP BY status").fetchall()
+            return {row["status"]: row["n"] for row in rows}
+
+    def _reclaim_expired(self, conn, now: float):
+        """Requeues (or fails) running jobs whose worker stopped renewing the lease."""
+        expired = conn.execute(
+            "SELECT id, attempts, max_attempts FROM jobs WHERE status = 'running' AND lease_expires < ?",
+            (now,)
+        ).fetchall()
+        for row in expired:
+            status = "queued" if row["attempts"] < row["max_attempts"] else "failed"
+            conn.execute(
+                "UPDATE jobs SET status = ?, error = 'Lease expired before the job finished.', "
+                "available_at = ?, lease_owner = NULL, lease_expires = NULL, updated_at = ? WHERE id = ?",
+                (status, now, now, row["id"])
+            )
+
+    def _backoff(self, attempts: int) -> float:
+        return self.retry_backoff_seconds * (2 ** (attempts - 1))
+
+    @staticmethod
+    def _fetch(conn, job_id: str) -> dict:
+        row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        job["payload"] = json.loads(job["payload"])
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
@@ -0,0 +1,307 @@
+# File: loadtest/fakes.py
+# In-memory stand-ins for Gemini, Firestore and the scout data APIs, so the service can run without credentials.
+
+import copy
+import json
+import threading
+import time
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+FAKE_QUERIES = [
+    "self-driving labs AND materials discovery",
+    "protein design foundation models",
+    "agent orchestration frameworks",
+    "neuromorphic hardware startups",
+    "cat:cs.AI AND autonomous agents",
+]
+
+FAKE_CANDIDATES = [
+    {
+        "name": "Self-driving labs",
+        "description": "Agentic planners that run robotic experiments for materials discovery.",
+        "evidence": ["self-driving labs AND materials discovery"],
+        "strength": 8,
+    },
+    {
+        "name": "Agent orchestration frameworks",
+        "description": "Libraries for coordinating multiple autonomous agents.",
+        "evidence": ["agent orchestration frameworks"],
+        "strength": 6,
+    },
+]
+
+FAKE_REPORT = {
+    "trends": [
+        {
+            "id": "autonomous-discovery-platforms",
+            "name": "Autonomous Discovery Platforms",
+            "description": "Closed-loop AI systems that plan and run experiments.",
+            "importance": 9,
+            "subtrends": [
+                {
+                    "id": "self-driving-labs",
+                    "name": "Self-Driving Labs",
+                    "description": "Robotic labs steered by agentic planners.",
+                    "startups": [
+                        {"name": "ExampleLab", "summary": "Automates materials R&D.", "rationale": "Owns the full loop."}
+                    ]
+                }
+            ]
+        }
+    ]
+}
+
+
+class FakeGenerativeModel:
+    """
+    Mimics vertexai GenerativeModel.generate_content: blocks for a fixed latency
+    (the real SDK call is synchronous too) and returns a canned answer by prompt type.
+    """
+    latency = 0.05
+
+    def __init__(self, model_name: str, generation_config=None, **kwargs):
+        self.model_name = model_name
+        self.generation_config = generation_config
+
+    def generate_content(self, prompt, **kwargs):
+        time.sleep(self.latency)
+        if "JSON SCHEMA" in prompt:
+            text = json.dumps(FAKE_REPORT)
+        elif "one per line" in prompt:
+            text = "\n".join(FAKE_QUERIES)
+        elif "trend candidates" in prompt:
+            text = json.dumps({"summary": "Closed-loop experimentation is accelerating.", "trends": FAKE_CANDIDATES})
+        else:
+            text = "1. Autonomous discovery: several signals point to closed-loop experimentation."
+        usage = SimpleNamespace(prompt_token_count=len(prompt) // 4, candidates_token_count=len(text) // 4)
+        return SimpleNamespace(text=text, usage_metadata=usage)
+
+
+class FakeResponse:
+    def __init__(self, payload=None, text=""):
+        self._payload = payload
+        self.text = text
+        self.status_code = 200
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self._payload
+
+
+class FakeHttp:
+    """Replaces requests.get with canned NewsAPI, GitHub and arXiv responses."""
+    latency = 0.02
+
+    def get(self, url, params=None, headers=None, **kwargs):
+        time.sleep(self.latency)
+        if "newsapi.org" in url:
+            return FakeResponse({"articles": [{"title": f"Headline {i} about {params.get('q')}"} for i in range(20)]})
+        if "api.github.com" in url:
+            return FakeResponse({"items": [
+                {"full_name": f"org/repo-{i}", "stargazers_count": 100 + i, "description": "An agent framework."}
+                for i in range(10)
+            ]})
+        if "arxiv.org" in url:
+            entries = "".join(
+                f"<entry><title>Paper {i}</title><published>2025-01-0{i % 9 + 1}T00:00:00Z</published></entry>"
+                for i in range(20)
+            )
+            return FakeResponse(text=f'<feed xmlns="http://www.w3.org/2005/Atom">{entries}</feed>')
+        raise ValueError(f"Unexpected URL in load test: {url}")
+
+
+class FakeDocumentSnapshot:
+    def __init__(self, doc_id, data):
+        self.id = doc_id
+        self._data = data
+        self.exists = data is not None
+
+    def to_dict(self):
+        return copy.deepcopy(self._data) if self._data is not None else None
+
+
+class FakeDocumentReference:
+    def __init__(self, client, path):
+        self._client = client
+        self.path = path
+        self.id = path.rsplit("/", 1)[-1]
+
+    def collection(self, name):
+        return FakeCollectionReference(self._client, f"{self.path}/{name}")
+
+    def get(self, transaction=None):
+        if transaction is not None:
+            transaction._read(self.path)
+        return self._client._get(self.path)
+
+    def set(self, data, merge=False):
+        self._client._commit([("set", self.path, data, merge)])
+
+    def update(self, data):
+        self._client._commit([("set", self.path, data, True)])
+
+    def delete(self):
+        self._client._commit([("delete", self.path, None, False)])
+
+
+class FakeCollectionReference:
+    def __init__(self, client, path):
+        self._client = client
+        self.path = path
+
+    def document(self, doc_id):
+        return FakeDocumentReference(self._client, f"{self.path}/{doc_id}")
+
+    def stream(self):
+        return self._client._list(self.path)
+
+
+class FakeWriteBatch:
+    def __init__(self, client):
+        self._client = client
+        self._ops = []
+
+    def set(self, ref, data, merge=False):
+        self._ops.append(("set", ref.path, data, merge))
+
+    def update(self, ref, data):
+        self._ops.append(("set", ref.path, data, True))
+
+    def delete(self, ref):
+        self._ops.append(("delete", ref.path, None, False))
+
+    def commit(self):
+        self._client._commit(self._ops)
+
+
+class FakeTransaction(FakeWriteBatch):
+    """
+    Works with the real @firestore.transactional decorator. Commits fail with
+    Aborted (and are retried by the decorator) if a document read in the
+    transaction was written by someone else in the meantime.
+    """
+    _read_only = False
+    _max_attempts = 5
+
+    def __init__(self, client):
+        super().__init__(client)
+        self._id = None
+        self._read_versions = {}
+
+    def _clean_up(self):
+        self._ops = []
+        self._read_versions = {}
+
+    def _begin(self, retry_id=None):
+        self._id = f"fake-transaction-{id(self)}-{time.monotonic_ns()}"
+
+    def _read(self, path):
+        self._read_versions.setdefault(path, self._client._version(path))
+
+    def _commit(self):
+        try:
+            self._client._commit(self._ops, expected_versions=self._read_versions)
+        finally:
+            self._clean_up()
+
+    def _rollback(self):
+        self._clean_up()
+
+
+class FakeFirestoreClient:
+    """
+    A thread-safe, in-memory Firestore with the subset of the API the service uses.
+    Counts document reads, writes and commits, and can simulate per-commit latency.
+    """
+    latency = 0.0
+
+    def __init__(self, *args, **kwargs):
+        self.documents = {}
+        self.versions = {}
+        self.reads = 0
+        self.writes = 0
+        self.commits = 0
+        self._lock = threading.Lock()
+
+    def collection(self, name):
+        return FakeCollectionReference(self, name)
+
+    def batch(self):
+        return FakeWriteBatch(self)
+
+    def transaction(self, **kwargs):
+        return FakeTransaction(self)
+
+    def _version(self, path):
+        with self._lock:
+            return self.versions.get(path, 0)
+
+    def _get(self, path):
+        with self._lock:
+            self.reads += 1
+            return FakeDocumentSnapshot(path.rsplit("/", 1)[-1], self.documents.get(path))
+
+    def _list(self, collection_path):
+        with self._lock:
+            prefix = collection_path + "/"
+            snapshots = [
+                FakeDocumentSnapshot(path[len(prefix):], data)
+                for path, data in sorted(self.documents.items())
+                if path.startswith(prefix) and "/" not in path[len(prefix):]
+            ]
+            self.reads += len(snapshots)
+            return snapshots
+
+    def _commit(self, ops, expected_versions=None):
+        from google.api_core.exceptions import Aborted
+        from google.cloud import firestore
+
+        time.sleep(self.latency)
+        now = datetime.now(timezone.utc)
+        with self._lock:
+            for path, version in (expected_versions or {}).items():
+                if self.versions.get(path, 0) != version:
+                    raise Aborted(f"Document {path} changed during the transaction.")
+            self.commits += 1
+            for kind, path, data, merge in ops:
+                self.writes += 1
+                self.versions[path] = self.versions.get(path, 0) + 1
+                if data is not None:
+                    # Like the real server, resolve SERVER_TIMESTAMP to the commit time.
+                    data = {key: now if value is firestore.SERVER_TIMESTAMP else value for key, value in data.items()}
+                if kind == "delete":
+                    self.documents.pop(path, None)
+                elif merge and path in self.documents:
+                    self.documents[path].update(copy.deepcopy(data))
+                else:
+                    self.documents[path] = copy.deepcopy(data)
+
+
+def install(model_latency: float = 0.05, http_latency: float = 0.02, pacing_scale: float = 0.0):
+    """
+    Patches Vertex AI, Firestore and requests with the fakes above. Must run before
+    api.py (or anything that imports model_router/agents) is imported.
+    """
+    import requests
+    import vertexai
+    import vertexai.generative_models
+    from google.cloud import firestore
+
+    FakeGenerativeModel.latency = model_latency
+    FakeHttp.latency = http_latency
+    vertexai.init = lambda *args, **kwargs: None
+    vertexai.generative_models.GenerativeModel = FakeGenerativeModel
+    firestore.Client = FakeFirestoreClient
+    requests.get = FakeHttp().get
+
+    # The scouts pause between API calls to respect rate limits; scale those pauses down.
+    import agents.news_agent
+    import agents.arxiv_agent
+    real_sleep = time.sleep
+    scaled_time = SimpleNamespace(sleep=lambda seconds: real_sleep(seconds * pacing_scale))
+    for module in (agents.news_agent, agents.arxiv_agent):
+        module.time = scaled_time
+
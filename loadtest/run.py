@@ -0,0 +1,322 @@
+# File: loadtest/run.py
+# Load-tests the FastAPI service with a stubbed pipeline and reports latency, throughput,
+# error rate and event-loop blocking per scenario.
+#
+# Usage:
+#   python -m loadtest.run                          # in-process, "default" profile
+#   python -m loadtest.run --profile mixed          # health checks while /analyze runs
+#   python -m loadtest.run --mode localhost --port 8765 --json results.json
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+# The test changes into a scratch directory, so make the repository importable from anywhere.
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+API_KEY = "loadtest-key"
+ORIGIN = "http://localhost:5173"
+
+# Each scenario is one kind of request plus the status code that counts as a success.
+SCENARIOS = {
+    "health": {"method": "GET", "path": "/", "headers": {}, "expect": 200},
+    "analyze": {"method": "POST", "path": "/analyze", "headers": {"X-API-KEY": API_KEY}, "expect": 200},
+    "scheduled": {"method": "POST", "path": "/run-scheduled-analysis", "headers": {"X-API-KEY": API_KEY}, "expect": 202},
+    "bad_key": {"method": "POST", "path": "/analyze", "headers": {"X-API-KEY": "wrong"}, "expect": 403},
+    "preflight": {
+        "method": "OPTIONS",
+        "path": "/analyze",
+        "headers": {
+            "Origin": ORIGIN,
+            "Access-Control-Request-Method": "POST",
+            "Access-Control-Request-Headers": "x-api-key",
+        },
+        "expect": 200,
+    },
+}
+
+# A profile is a list of phases; each phase runs its (scenario, concurrency, requests) loads at the same time.
+PROFILES = {
+    "smoke": [
+        [("health", 2, 20)],
+        [("preflight", 2, 20)],
+        [("bad_key", 2, 20)],
+        [("scheduled", 2, 20)],
+        [("analyze", 1, 2)],
+    ],
+    "default": [
+        [("health", 50, 2000)],
+        [("preflight", 50, 1000)],
+        [("bad_key", 20, 500)],
+        [("scheduled", 20, 500)],
+        [("analyze", 4, 8)],
+    ],
+    # Cheap endpoints under load while pipeline runs are in flight; blocking handlers show up here.
+    "mixed": [
+        [("health", 20, 1000), ("preflight", 10, 300), ("scheduled", 5, 100), ("analyze", 2, 4)],
+    ],
+}
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile: the smallest value with at least pct% of the values at or below it."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, math.ceil(pct * len(ordered) / 100) - 1))
+    return ordered[index]
+
+
+class LoopMonitor:
+    """
+    Sleeps in short intervals on the server's event loop and records how late it
+    wakes up. Lag beyond the interval means something blocked the loop.
+    """
+    def __init__(self, interval: float = 0.005, threshold: float = 0.005):
+        self.interval = interval
+        self.threshold = threshold
+        self.lags = []
+        self._task = None
+
+    def start(self):
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(self.interval)
+            self.lags.append(max(0.0, loop.time() - start - self.interval))
+
+    def take(self) -> dict:
+        """Returns and resets the blocking statistics gathered since the last call."""
+        lags, self.lags = self.lags, []
+        blocked = [lag for lag in lags if lag > self.threshold]
+        return {
+            "blocked_total_ms": sum(blocked) * 1000,
+            "blocked_events": len(blocked),
+            "max_lag_ms": max(lags, default=0.0) * 1000,
+            "p99_lag_ms": percentile(lags, 99) * 1000,
+        }
+
+
+async def run_load(client, scenario_name: str, concurrency: int, total: int) -> dict:
+    """Sends `total` requests for one scenario from `concurrency` concurrent clients."""
+    scenario = SCENARIOS[scenario_name]
+    latencies, errors = [], 0
+    remaining = total
+
+    async def client_loop():
+        nonlocal remaining, errors
+        while remaining > 0:
+            remaining -= 1
+            start = time.perf_counter()
+            try:
+                response = await client.request(scenario["method"], scenario["path"], headers=scenario["headers"])
+                if response.status_code != scenario["expect"]:
+                    errors += 1
+            except Exception:
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client_loop() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    return {
+        "scenario": scenario_name,
+        "concurrency": concurrency,
+        "requests": total,
+        "errors": errors,
+        "error_rate": errors / total if total else 0.0,
+        "throughput_rps": total / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "max_ms": max(latencies, default=0.0) * 1000,
+        "mean_ms": statistics.fmean(latencies) * 1000 if latencies else 0.0,
+    }
+
+
+async def run_profile(client, phases, monitor_take) -> list:
+    results = []
+    for index, phase in enumerate(phases, start=1):
+        monitor_take()  # discard lag recorded between phases
+        phase_results = await asyncio.gather(*(run_load(client, *load) for load in phase))
+        blocking = monitor_take()
+        for result in phase_results:
+            result["phase"] = index
+            result.update(blocking)
+        results.extend(phase_results)
+    return results
+
+
+def print_results(results: list):
+    header = (
+        f"{'phase':>5} {'scenario':<10} {'conc':>4} {'reqs':>5} {'err%':>6} {'rps':>8} "
+        f"{'p50ms':>8} {'p95ms':>8} {'p99ms':>8} {'maxms':>8} {'loop-blocked-ms':>16} {'max-lag-ms':>11}"
+    )
+    print("\n" + header)
+    print("-" * len(header))
+    for r in results:
+        print(
+            f"{r['phase']:>5} {r['scenario']:<10} {r['concurrency']:>4} {r['requests']:>5} "
+            f"{r['error_rate'] * 100:>6.1f} {r['throughput_rps']:>8.1f} {r['p50_ms']:>8.1f} {r['p95_ms']:>8.1f} "
+            f"{r['p99_ms']:>8.1f} {r['max_ms']:>8.1f} {r['blocked_total_ms']:>16.1f} {r['max_lag_ms']:>11.1f}"
+        )
+    print("\n(loop-blocked-ms and max-lag-ms are measured per phase on the server's event loop.)")
+
+
+def prepare_environment(args, workdir: str):
+    """Points every local side effect at a scratch directory and installs the fakes."""
+    os.environ["API_KEY"] = API_KEY
+    # The scouts skip their data APIs without keys; the fake HTTP layer accepts any value.
+    os.environ["NEWS_API_KEY"] = "loadtest"
+    os.environ["GITHUB_TOKEN"] = "loadtest"
+    os.environ["QUERY_HISTORY_PATH"] = os.path.join(workdir, "query_history.json")
+    os.environ["JOB_QUEUE_PATH"] = os.path.join(workdir, "jobs.sqlite3")
+    os.chdir(workdir)  # the orchestrator writes its report to the working directory
+
+    from loadtest import fakes
+    fakes.install(model_latency=args.model_latency, http_latency=args.http_latency, pacing_scale=args.pacing_scale)
+
+
+def worker_process(args, workdir: str, ready, stop, stats):
+    """
+    Drains the job queue in its own process with its own fakes and orchestrator,
+    so /run-scheduled-analysis jobs complete without sharing the API's pipeline or GIL.
+    """
+    prepare_environment(args, workdir)
+    from google.cloud import firestore
+    from job_queue import JobQueue
+    from main import initialize_system, build_orchestrator
+    from report_store import ReportStore
+    from worker import Worker
+
+    report_store = ReportStore(firestore.Client())
+    worker = Worker("loadtest-worker", JobQueue(), build_orchestrator(initialize_system()), report_store)
+    ready.set()
+    while not stop.is_set():
+        if not worker.run_once():
+            stop.wait(0.05)
+    report_store.flush(timeout=10)
+    db = report_store.db
+    stats.put({"writes": db.writes, "commits": db.commits, "reads": db.reads})
+
+
+def start_worker(args, workdir: str):
+    """
+    Starts worker_process and waits until it is ready to take jobs.
+    Returns the process, its stop event and the queue it reports stats on.
+    """
+    import multiprocessing
+
+    context = multiprocessing.get_context("spawn")
+    ready, stop, stats = context.Event(), context.Event(), context.Queue()
+    process = context.Process(target=worker_process, args=(args, workdir, ready, stop, stats), daemon=True)
+    process.start()
+    if not ready.wait(timeout=60):
+        raise RuntimeError("The load-test worker did not start within 60s.")
+    return process, stop, stats
+
+
+async def run_in_process(app, phases) -> list:
+    import httpx
+
+    monitor = LoopMonitor()
+    monitor.start()
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=None) as client:
+        return await run_profile(client, phases, monitor.take)
+
+
+async def run_on_localhost(app, phases, port: int) -> list:
+    import httpx
+    import uvicorn
+
+    monitor = LoopMonitor()
+    loop_ready = threading.Event()
+    server_loop = {}
+
+    async def start_monitor():
+        server_loop["loop"] = asyncio.get_running_loop()
+        monitor.start()
+        loop_ready.set()
+
+    app.router.on_startup.append(start_monitor)
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    loop_ready.wait(timeout=10)
+    while not server.started:
+        await asyncio.sleep(0.05)
+
+    async def take_on_server_loop():
+        return monitor.take()
+
+    def take():
+        # The monitor lives on the server's loop; read its stats from there.
+        return asyncio.run_coroutine_threadsafe(take_on_server_loop(), server_loop["loop"]).result()
+
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+    try:
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=None, limits=limits) as client:
+            return await run_profile(client, phases, take)
+    finally:
+        server.should_exit = True
+        thread.join(timeout=10)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the API with a fake model, Firestore and data APIs.")
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="default")
+    parser.add_argument("--scenario", choices=sorted(SCENARIOS), help="Run a single scenario instead of a profile.")
+    parser.add_argument("--concurrency", type=int, default=10, help="Concurrency for --scenario.")
+    parser.add_argument("--requests", type=int, default=200, help="Number of requests for --scenario.")
+    parser.add_argument("--mode", choices=["inprocess", "localhost"], default="inprocess")
+    parser.add_argument("--port", type=int, default=8765, help="Port for --mode localhost.")
+    parser.add_argument("--model-latency", type=float, default=0.05, help="Seconds per fake model call.")
+    parser.add_argument("--http-latency", type=float, default=0.02, help="Seconds per fake data API call.")
+    parser.add_argument("--pacing-scale", type=float, default=0.0, help="Scale for the scouts' rate-limit sleeps.")
+    parser.add_argument("--no-worker", action="store_true", help="Do not drain the job queue during the test.")
+    parser.add_argument("--json", help="Also write the results to this file.")
+    args = parser.parse_args()
+
+    json_path = os.path.abspath(args.json) if args.json else None
+    workdir = tempfile.mkdtemp(prefix="loadtest-")
+    prepare_environment(args, workdir)
+    import api
+
+    phases = [[(args.scenario, args.concurrency, args.requests)]] if args.scenario else PROFILES[args.profile]
+    worker = None if args.no_worker else start_worker(args, workdir)
+
+    print(f"Running load test ({args.mode}, {'scenario ' + args.scenario if args.scenario else 'profile ' + args.profile})...")
+    if args.mode == "inprocess":
+        results = asyncio.run(run_in_process(api.app, phases))
+    else:
+        results = asyncio.run(run_on_localhost(api.app, phases, args.port))
+
+    print_results(results)
+    if worker is not None:
+        process, stop_worker, worker_stats = worker
+        stop_worker.set()
+        db = worker_stats.get(timeout=60)
+        process.join(timeout=10)
+        print(f"Fake Firestore (worker): {db['writes']} writes in {db['commits']} commits, {db['reads']} reads")
+    print(f"Job queue: {api.job_queue.counts()}")
+
+    if json_path:
+        with open(json_path, "w") as f:
+            json.dump({"profile": args.profile, "mode": args.mode, "results": results}, f, indent=2)
+        print(f"Results saved to {json_path}")
+
+
+if __name__ == "__main__":
+    main()
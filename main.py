@@ -1,30 +1,33 @@
 # main.py (Updated)
+import argparse
 import vertexai
-from vertexai.generative_models import GenerativeModel, GenerationConfig
 from agents.news_agent import NewsScoutAgent
 from agents.github_agent import GithubScoutAgent
 from agents.arxiv_agent import ArxivScoutAgent
 from agents.final_report_agent import FinalReportAgent # Import the new agent
+from model_router import ModelRouter
 from orchestrator import Orchestrator
 from config import PROJECT_ID, LOCATION, NEWS_API_KEY, GITHUB_TOKEN
 
 def initialize_system():
-    """Initializes Vertex AI and the Gemini model."""
+    """Initializes Vertex AI and the per-stage model router."""
     print("Initializing Vertex AI...")
     vertexai.init(project=PROJECT_ID, location=LOCATION)
-    
-    generation_config = GenerationConfig(
-        temperature=0.6,
-        top_p=0.95,
-        max_output_tokens=8192,
-    )
-    
-    model = GenerativeModel(
-        "gemini-2.5-pro",
-        generation_config=generation_config
+
+    router = ModelRouter()
+    print("Vertex AI and model router initialized.")
+    return router
+
+def build_orchestrator(router: ModelRouter) -> Orchestrator:
+    """Wires every agent to the model configured for its stage."""
+    strategy_model = router.for_stage("strategy")
+    scout_model = router.for_stage("scout_analysis")
+    return Orchestrator(
+        news_scout=NewsScoutAgent(model=scout_model, strategy_model=strategy_model),
+        github_scout=GithubScoutAgent(model=scout_model, strategy_model=strategy_model),
+        arxiv_scout=ArxivScoutAgent(model=scout_model, strategy_model=strategy_model),
+        final_report_agent=FinalReportAgent(model=router.for_stage("final_synthesis"))
     )
-    print("Vertex AI and Gemini 2.5 Pro model initialized.")
-    return model
 
 def check_prerequisites():
     """Checks if necessary API keys are set in the environment."""
@@ -37,15 +40,19 @@ def check_prerequisites():
     return True
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the full trend discovery pipeline locally.")
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Write stack samples (.cpu.folded) and per-stage allocation reports (.alloc.txt) next to the report."
+    )
+    args = parser.parse_args()
+
     if check_prerequisites():
-        gemini_model = initialize_system()
+        model_router = initialize_system()
 
         # Instantiate all agents
-        orchestrator = Orchestrator(
-            news_scout=NewsScoutAgent(model=gemini_model),
-            github_scout=GithubScoutAgent(model=gemini_model),
-            arxiv_scout=ArxivScoutAgent(model=gemini_model),
-            final_report_agent=FinalReportAgent(model=gemini_model) # Use the new agent
-        )
-        
-        orchestrator.run() # You can still run it locally to test
\ No newline at end of file
+        orchestrator = build_orchestrator(model_router)
+
+        orchestrator.run(profile=args.profile) # You can still run it locally to test
+        model_router.print_stats()
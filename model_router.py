@@ -0,0 +1,95 @@
+# model_router.py
+# Routes each pipeline stage to its own Gemini model and records per-model latency and token use.
+
+import threading
+import time
+from typing import Dict
+from vertexai.generative_models import GenerativeModel, GenerationConfig
+from config import MODEL_ROUTING
+
+
+class RoutedModel:
+    """
+    A drop-in stand-in for GenerativeModel that is bound to one pipeline stage.
+    Every generate_content call is timed and its token usage is reported to the router.
+    """
+    def __init__(self, router: "ModelRouter", stage: str, model_name: str, model: GenerativeModel):
+        self.router = router
+        self.stage = stage
+        self.model_name = model_name
+        self.model = model
+
+    def generate_content(self, *args, **kwargs):
+        start = time.perf_counter()
+        response = self.model.generate_content(*args, **kwargs)
+        latency = time.perf_counter() - start
+        self.router.record(self.stage, self.model_name, latency, getattr(response, "usage_metadata", None))
+        return response
+
+
+class ModelRouter:
+    """
+    Builds one model per stage from a routing table (see config.MODEL_ROUTING)
+    and aggregates latency/token statistics so the routing can be tuned.
+    """
+    def __init__(self, routing: Dict[str, dict] = None, model_factory=GenerativeModel):
+        self.routing = routing or MODEL_ROUTING
+        self.model_factory = model_factory
+        self._models: Dict[str, RoutedModel] = {}
+        self._stats: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+    def for_stage(self, stage: str) -> RoutedModel:
+        """Returns the (cached) model bound to the given stage."""
+        if stage not in self.routing:
+            raise ValueError(f"No model route configured for stage '{stage}'.")
+        if stage not in self._models:
+            profile = dict(self.routing[stage])
+            model_name = profile.pop("model")
+            model = self.model_factory(model_name, generation_config=GenerationConfig(**profile))
+            self._models[stage] = RoutedModel(self, stage, model_name, model)
+        return self._models[stage]
+
+    def record(self, stage: str, model_name: str, latency: float, usage_metadata=None):
+        """Adds one call to the running statistics for a stage/model pair."""
+        key = f"{stage}:{model_name}"
+        with self._lock:
+            entry = self._stats.setdefault(key, {
+                "stage": stage,
+                "model": model_name,
+                "calls": 0,
+                "total_latency_s": 0.0,
+                "max_latency_s": 0.0,
+                "prompt_tokens": 0,
+                "output_tokens": 0,
+                "thoughts_tokens": 0,
+                "total_tokens": 0,
+            })
+            entry["calls"] += 1
+            entry["total_latency_s"] += latency
+            entry["max_latency_s"] = max(entry["max_latency_s"], latency)
+            if usage_metadata is not None:
+                entry["prompt_tokens"] += getattr(usage_metadata, "prompt_token_count", 0) or 0
+                entry["output_tokens"] += getattr(usage_metadata, "candidates_token_count", 0) or 0
+                # Thinking tokens (2.5 models) are billed as output and count against max_output_tokens.
+                entry["thoughts_tokens"] += getattr(usage_metadata, "thoughts_token_count", 0) or 0
+                entry["total_tokens"] += getattr(usage_metadata, "total_token_count", 0) or 0
+
+    def stats(self) -> Dict[str, dict]:
+        """Returns a snapshot of the per-stage/model statistics, including average latency."""
+        with self._lock:
+            snapshot = {key: dict(entry) for key, entry in self._stats.items()}
+        for entry in snapshot.values():
+            entry["avg_latency_s"] = entry["total_latency_s"] / entry["calls"] if entry["calls"] else 0.0
+        return snapshot
+
+    def print_stats(self):
+        """Prints a short per-model latency and token summary."""
+        print("\n[ModelRouter] Model usage by stage:")
+        for entry in self.stats().values():
+            print(
+                f"  {entry['stage']:<16} {entry['model']:<20} calls={entry['calls']:<3} "
+                f"avg={entry['avg_latency_s']:.2f}s max={entry['max_latency_s']:.2f}s "
+                f"prompt_tokens={entry['prompt_tokens']} output_tokens={entry['output_tokens']} "
+                f"thoughts_tokens={entry['thoughts_tokens']} total_tokens={entry['total_tokens']}"
+            )
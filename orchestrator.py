@@ -1,10 +1,13 @@
 # orchestrator.py (Updated)
 import json
+import os
 from agents.news_agent import NewsScoutAgent
 from agents.github_agent import GithubScoutAgent
 from agents.arxiv_agent import ArxivScoutAgent
 # Import the new final agent
 from agents.final_report_agent import FinalReportAgent
+from agents.trend_merge_agent import TrendMergeAgent
+from profiling import RunProfiler, NULL_PROFILER
 from config import VC_PERSONA, GITHUB_INTEREST_AREA
 
 class Orchestrator:
@@ -13,34 +16,49 @@ class Orchestrator:
         news_scout: NewsScoutAgent,
         github_scout: GithubScoutAgent,
         arxiv_scout: ArxivScoutAgent,
-        final_report_agent: FinalReportAgent # Use the new agent
+        final_report_agent: FinalReportAgent, # Use the new agent
+        trend_merger: TrendMergeAgent = None
     ):
         self.news_scout = news_scout
         self.github_scout = github_scout
         self.arxiv_scout = arxiv_scout
         self.final_report_agent = final_report_agent
+        self.trend_merger = trend_merger or TrendMergeAgent()
 
-    def run(self):
+    def run(self, profile: bool = False):
         """
         Executes the full pipeline and generates a single, structured report for the frontend.
+        With profile=True, stack samples and per-stage allocation reports are written next to the report.
         """
         print("[Orchestrator] Starting full trend discovery process...")
+        output_filename = "final_verified_trends_report.json"
+        profiler = RunProfiler() if profile else NULL_PROFILER
 
-        # --- 1. Scout for raw signals ---
-        news_report = self.news_scout.execute(VC_PERSONA)
-        github_report = self.github_scout.execute(GITHUB_INTEREST_AREA)
-        arxiv_report = self.arxiv_scout.execute(VC_PERSONA)
-        
-        all_reports = [news_report, github_report, arxiv_report]
+        with profiler:
+            try:
+                # --- 1. Scout for raw signals ---
+                with profiler.stage("news_scout"):
+                    news_report = self.news_scout.execute(VC_PERSONA)
+                with profiler.stage("github_scout"):
+                    github_report = self.github_scout.execute(GITHUB_INTEREST_AREA)
+                with profiler.stage("arxiv_scout"):
+                    arxiv_report = self.arxiv_scout.execute(VC_PERSONA)
 
-        # --- 2. Generate the final, frontend-compatible report ---
-        final_report_json_str = self.final_report_agent.execute(all_reports)
+                all_reports = [news_report, github_report, arxiv_report]
+
+                # --- 2. Merge overlapping trend candidates across scouts ---
+                with profiler.stage("trend_merge"):
+                    merged_candidates = self.trend_merger.execute(all_reports)
+
+                # --- 3. Generate the final, frontend-compatible report ---
+                with profiler.stage("final_report"):
+                    final_report_json_str = self.final_report_agent.execute(merged_candidates)
+            finally:
+                profiler.write_reports(os.path.splitext(output_filename)[0])
 
-        output_filename = "final_verified_trends_report.json"
-        
         with open(output_filename, "w") as f:
             f.write(final_report_json_str)
         print(f"\n[Orchestrator] Process complete. Final verified report saved to {output_filename}")
     
         print(f"\n[Orchestrator] Process complete.")
-        return final_report_json_str
\ No newline at end of file
+        return final_report_json_str
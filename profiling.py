@@ -0,0 +1,163 @@
+# profiling.py
+# Opt-in profiling for pipeline runs: a sampling stack profiler plus per-stage tracemalloc snapshots.
+
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import nullcontext
+
+# tracemalloc is process-wide, so only one run can be profiled at a time.
+_active_lock = threading.Lock()
+
+
+class NullProfiler:
+    """Used when profiling is off; every hook is a no-op."""
+    active = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def stage(self, name: str):
+        return nullcontext()
+
+    def write_reports(self, output_base: str) -> list:
+        return []
+
+
+NULL_PROFILER = NullProfiler()
+
+
+class RunProfiler:
+    """
+    Samples the stacks of the profiled thread (and any threads it starts) at a
+    fixed interval and snapshots tracemalloc around each stage. Samples are
+    wall-clock, so time spent waiting on the network or the model shows up too.
+
+    Reports are written as collapsed stacks (flamegraph.pl / speedscope) and a
+    plain-text top-allocations report per stage.
+    """
+    def __init__(self, interval: float = 0.005, top_n: int = 15, traceback_frames: int = 10):
+        self.interval = interval
+        self.top_n = top_n
+        self.traceback_frames = traceback_frames
+        self.active = False
+        self.samples = {}
+        self.stages = []
+        self._stage = "setup"
+        self._stop = threading.Event()
+        self._sampler = None
+        self._excluded_threads = set()
+        self._started_tracemalloc = False
+
+    def __enter__(self):
+        if not _active_lock.acquire(blocking=False):
+            print("[Profiler] Another run is already being profiled; this run will not be profiled.")
+            return self
+        self.active = True
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.traceback_frames)
+            self._started_tracemalloc = True
+        # Threads that already exist (server loop, heartbeats, ...) are not part of this run.
+        self._excluded_threads = set(sys._current_frames()) - {threading.get_ident()}
+        self._sampler = threading.Thread(target=self._sample_loop, name="profiler-sampler", daemon=True)
+        self._sampler.start()
+        print("[Profiler] Profiling enabled for this run.")
+        return self
+
+    def __exit__(self, *exc):
+        if not self.active:
+            return False
+        self._stop.set()
+        self._sampler.join()
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+        self.active = False
+        _active_lock.release()
+        return False
+
+    def stage(self, name: str):
+        return _Stage(self, name) if self.active else nullcontext()
+
+    def _sample_loop(self):
+        sampler_id = threading.get_ident()
+        names = {}
+        while not self._stop.wait(self.interval):
+            stage = self._stage
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == sampler_id or thread_id in self._excluded_threads:
+                    continue
+                if thread_id not in names:
+                    names = {thread.ident: thread.name for thread in threading.enumerate()}
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                key = ";".join([stage, names.get(thread_id, str(thread_id))] + stack[::-1])
+                self.samples[key] = self.samples.get(key, 0) + 1
+
+    def write_reports(self, output_base: str) -> list:
+        """Writes '<base>.cpu.folded' and '<base>.alloc.txt' and returns their paths."""
+        if not self.samples and not self.stages:
+            return []
+        folded_path = f"{output_base}.cpu.folded"
+        alloc_path = f"{output_base}.alloc.txt"
+
+        with open(folded_path, "w") as f:
+            for stack, count in sorted(self.samples.items()):
+                f.write(f"{stack} {count}\n")
+
+        with open(alloc_path, "w") as f:
+            f.write(f"Sampling interval: {self.interval * 1000:.1f} ms, {sum(self.samples.values())} samples\n")
+            for stage in self.stages:
+                f.write(
+                    f"\n=== {stage['name']}: {stage['seconds']:.2f}s, "
+                    f"net {stage['net_bytes'] / 1024:+.1f} KiB, peak {stage['peak_bytes'] / 1024:.1f} KiB ===\n"
+                )
+                for stat in stage["top"]:
+                    f.write(f"{stat}\n")
+
+        print(f"[Profiler] Wrote {folded_path} and {alloc_path}")
+        return [folded_path, alloc_path]
+
+
+class _Stage:
+    """Times one pipeline stage and diffs tracemalloc snapshots taken around it."""
+    _filters = [
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, __file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    ]
+
+    def __init__(self, profiler: RunProfiler, name: str):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.previous_stage = self.profiler._stage
+        self.profiler._stage = self.name
+        tracemalloc.reset_peak()
+        self.start_memory = tracemalloc.get_traced_memory()[0]
+        self.before = tracemalloc.take_snapshot().filter_traces(self._filters)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        seconds = time.perf_counter() - self.start
+        current, peak = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot().filter_traces(self._filters)
+        self.profiler.stages.append({
+            "name": self.name,
+            "seconds": seconds,
+            "net_bytes": current - self.start_memory,
+            "peak_bytes": peak,
+            "top": after.compare_to(self.before, "lineno")[:self.profiler.top_n],
+        })
+        self.profiler._stage = self.previous_stage
+        return False
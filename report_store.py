@@ -0,0 +1,237 @@
+# report_store.py
+# Stores reports in Firestore as one document per trend, writing only the trends that changed.
+#
+# Layout:
+#   reports/latest                    -> index: trend order, per-trend hashes/summaries, report hash
+#   reports/latest/trends/{trend_id}  -> one Trend object (with its subtrends and startups)
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from google.cloud import firestore
+
+# Firestore allows at most 500 writes per transaction.
+MAX_TRANSACTION_WRITES = 500
+
+
+class ReportTooLargeError(ValueError):
+    """The report needs more writes than fit in one Firestore transaction."""
+
+
+def content_hash(data) -> str:
+    """A stable hash of a JSON-compatible value, independent of key order."""
+    canonical = json.dumps(data, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def trend_doc_id(trend: dict, used: set) -> str:
+    """Returns a unique, Firestore-safe document id for a trend, based on its id or name."""
+    base = str(trend.get("id") or trend.get("name") or "trend")
+    base = re.sub(r"[^a-zA-Z0-9_-]+", "-", base).strip("-").lower()[:100] or "trend"
+    doc_id, suffix = base, 2
+    while doc_id in used:
+        doc_id, suffix = f"{base}-{suffix}", suffix + 1
+    used.add(doc_id)
+    return doc_id
+
+
+class ReportStore:
+    """
+    Delta-aware report persistence. save() reads the index document once,
+    skips the run entirely when nothing changed, and otherwise writes only the
+    new/changed trend documents (and deletes removed ones). The read and the
+    writes share one transaction, so concurrent savers never compute their
+    delta from a stale index.
+
+    save_async() is the write-behind variant: the report is kept in a local
+    spool file and written by a background thread, so a slow Firestore call
+    does not hold up the pipeline. Newer reports replace pending ones, and
+    last_outcome records how the latest background write went.
+    """
+    def __init__(self, db, collection: str = "reports", document: str = "latest", spool_path: str = None):
+        self.db = db
+        self.index_ref = db.collection(collection).document(document)
+        self.trends_ref = self.index_ref.collection("trends")
+        self.spool_path = spool_path
+        self._pending = None
+        self._writing = False
+        self._cond = threading.Condition()
+        self._writer = None
+        self.last_outcome = None
+
+        # A report spooled by a previous process that never reached Firestore.
+        if spool_path and os.path.exists(spool_path):
+            with open(spool_path) as f:
+                pending = f.read()
+            print("[ReportStore] Found an unsaved report from a previous run. Resuming write...")
+            self.save_async(pending)
+
+    def save(self, final_report_json_str: str) -> dict:
+        """Writes the report synchronously and returns write statistics."""
+        trends, hashes, report_hash = self._prepare(final_report_json_str)
+
+        # Retried by Firestore if another saver commits in between the index read and our writes.
+        @firestore.transactional
+        def write(transaction) -> dict:
+            index = self.index_ref.get(transaction=transaction).to_dict() or {}
+            return self._write_delta(transaction, index, trends, hashes, report_hash)
+
+        stats = write(self.db.transaction())
+        if stats["skipped"]:
+            print("[ReportStore] Report unchanged. Skipping Firestore write.")
+        else:
+            print(f"[ReportStore] Saved report: {stats['written']} trend(s) written, "
+                  f"{stats['deleted']} deleted, {stats['unchanged']} unchanged.")
+        return stats
+
+    def report_hash(self, final_report_json_str: str) -> str:
+        """The hash save() records in the index for this report. Raises json.JSONDecodeError for invalid JSON."""
+        return self._prepare(final_report_json_str)[2]
+
+    @staticmethod
+    def _prepare(final_report_json_str: str):
+        """Splits a report into (doc_id, trend) pairs with per-trend hashes and the overall report hash."""
+        report = json.loads(final_report_json_str)
+        used_ids = set()
+        trends = [(trend_doc_id(trend, used_ids), trend) for trend in report.get("trends", [])]
+        hashes = {doc_id: content_hash(trend) for doc_id, trend in trends}
+        report_hash = content_hash([[doc_id, hashes[doc_id]] for doc_id, _ in trends])
+        return trends, hashes, report_hash
+
+    def _write_delta(self, transaction, index: dict, trends: list, hashes: dict, report_hash: str) -> dict:
+        """Queues the writes that bring the stored report from `index` to `trends` on the transaction."""
+        if index.get("report_hash") == report_hash:
+            return {"written": 0, "deleted": 0, "unchanged": len(trends), "skipped": True, "report_hash": report_hash}
+
+        old_hashes = index.get("trend_hashes", {})
+        changed = [(doc_id, trend) for doc_id, trend in trends if old_hashes.get(doc_id) != hashes[doc_id]]
+        removed = [doc_id for doc_id in old_hashes if doc_id not in hashes]
+
+        writes = [("set", self.trends_ref.document(doc_id), dict(trend, content_hash=hashes[doc_id]))
+                  for doc_id, trend in changed]
+        writes += [("delete", self.trends_ref.document(doc_id), None) for doc_id in removed]
+        # All writes commit together, so readers never see hashes for trend documents that are not written yet.
+        writes.append(("set", self.index_ref, {
+            "trend_ids": [doc_id for doc_id, _ in trends],
+            "trend_hashes": hashes,
+            "trends": [
+                {"id": doc_id, "name": trend.get("name"), "importance": trend.get("importance")}
+                for doc_id, trend in trends
+            ],
+            "report_hash": report_hash,
+            "last_updated": firestore.SERVER_TIMESTAMP
+        }))
+
+        if len(writes) > MAX_TRANSACTION_WRITES:
+            raise ReportTooLargeError(
+                f"Report needs {len(writes)} writes; at most {MAX_TRANSACTION_WRITES} fit in one transaction."
+            )
+        for kind, ref, data in writes:
+            if kind == "set":
+                transaction.set(ref, data)
+            else:
+                transaction.delete(ref)
+
+        return {
+            "written": len(changed),
+            "deleted": len(removed),
+            "unchanged": len(trends) - len(changed),
+            "skipped": False,
+            "report_hash": report_hash,
+        }
+
+    def save_async(self, final_report_json_str: str):
+        """Queues the report for a background write and returns immediately."""
+        with self._cond:
+            if self.spool_path:
+                tmp_path = f"{self.spool_path}.tmp"
+                with open(tmp_path, "w") as f:
+                    f.write(final_report_json_str)
+                os.replace(tmp_path, self.spool_path)
+            self._pending = final_report_json_str
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._write_loop, name="report-writer", daemon=True)
+                self._writer.start()
+            self._cond.notify_all()
+
+    def flush(self, timeout: float = None) -> bool:
+        """Waits until queued reports are written. Returns False on timeout."""
+        with self._cond:
+            return self._cond.wait_for(lambda: self._pending is None and not self._writing, timeout)
+
+    def load_index(self) -> dict:
+        """Returns the index document: trend order, hashes and short summaries."""
+        return self.index_ref.get().to_dict()
+
+    def resolve_persistence(self, persistence: dict, finished_at: float) -> dict:
+        """
+        Resolves a job's "pending" persistence entry against the index: "saved" once the
+        index carries its report_hash, "superseded" if a different report was saved after
+        the job finished. Other entries are returned unchanged.
+        """
+        if not persistence or persistence.get("status") != "pending":
+            return persistence
+        index = self.load_index() or {}
+        if index.get("report_hash") == persistence.get("report_hash"):
+            return dict(persistence, status="saved")
+        last_updated = index.get("last_updated")
+        if last_updated is not None and last_updated.timestamp() > finished_at:
+            return dict(persistence, status="superseded")
+        return persistence
+
+    def load_trend(self, trend_id: str) -> dict:
+        """Returns a single trend document, or None if it does not exist."""
+        return self.trends_ref.document(trend_id).get().to_dict()
+
+    def load(self) -> dict:
+        """Reassembles the full report from the index and trend documents."""
+        index = self.load_index()
+        if index is None:
+            return None
+        trends = {snapshot.id: snapshot.to_dict() for snapshot in self.trends_ref.stream()}
+        ordered = []
+        for doc_id in index.get("trend_ids", []):
+            if doc_id in trends:
+                trend = trends[doc_id]
+                trend.pop("content_hash", None)
+                ordered.append(trend)
+        return {"trends": ordered}
+
+    def _write_loop(self):
+        retry_delay = 1
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._pending is not None)
+                report, self._pending = self._pending, None
+                self._writing = True
+            try:
+                stats = self.save(report)
+                retry_delay = 1
+                with self._cond:
+                    self.last_outcome = dict(stats, status="saved")
+                    # Only drop the spool if no newer report was queued meanwhile.
+                    if self._pending is None and self.spool_path and os.path.exists(self.spool_path):
+                        os.remove(self.spool_path)
+            except (json.JSONDecodeError, ReportTooLargeError) as e:
+                # Retrying will not help; drop the report rather than block newer ones.
+                print(f"[ReportStore] Discarding report that cannot be saved: {e}")
+                with self._cond:
+                    self.last_outcome = {"status": "discarded", "error": str(e)}
+                    if self._pending is None and self.spool_path and os.path.exists(self.spool_path):
+                        os.remove(self.spool_path)
+            except Exception as e:
+                print(f"[ReportStore] Failed to save report to Firestore: {e}. Retrying in {retry_delay}s...")
+                with self._cond:
+                    self.last_outcome = {"status": "retrying", "error": str(e)}
+                time.sleep(retry_delay)
+                retry_delay = min(retry_delay * 2, 60)
+                with self._cond:
+                    if self._pending is None:
+                        self._pending = report
+            finally:
+                with self._cond:
+                    self._writing = False
+                    self._cond.notify_all()
@@ -0,0 +1,108 @@
+# tests/test_job_queue.py
+# Walks JobQueue through leasing, the concurrency cap, lease expiry, retry backoff and final failure.
+#
+# Usage: python -m pytest -q
+
+from types import SimpleNamespace
+
+import pytest
+
+import job_queue
+from job_queue import JobQueue
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """A manually advanced clock in place of time.time() inside job_queue."""
+    now = SimpleNamespace(value=1000.0)
+    monkeypatch.setattr(job_queue, "time", SimpleNamespace(time=lambda: now.value))
+    return now
+
+
+@pytest.fixture
+def queue(tmp_path, clock):
+    return JobQueue(str(tmp_path / "jobs.sqlite3"), lease_seconds=60, max_attempts=3, retry_backoff_seconds=10)
+
+
+def test_lease_hands_out_jobs_oldest_first_and_once(queue, clock):
+    first = queue.enqueue("scheduled_analysis", {"profile": True})
+    clock.value += 1
+    second = queue.enqueue("scheduled_analysis")
+
+    job = queue.lease("worker-1")
+    assert (job["id"], job["status"], job["attempts"], job["payload"]) == (first, "running", 1, {"profile": True})
+    assert job["lease_owner"] == "worker-1" and job["lease_expires"] == clock.value + 60
+    assert queue.lease("worker-2")["id"] == second
+    assert queue.lease("worker-3") is None
+
+
+def test_max_running_caps_jobs_in_progress(queue):
+    for _ in range(3):
+        queue.enqueue("scheduled_analysis")
+
+    assert queue.lease("worker-1", max_running=2) is not None
+    job = queue.lease("worker-2", max_running=2)
+    assert queue.lease("worker-3", max_running=2) is None
+
+    assert queue.complete(job["id"], "worker-2", {"report_bytes": 10})
+    assert queue.lease("worker-3", max_running=2) is not None
+    assert queue.counts() == {"running": 2, "succeeded": 1}
+
+
+def test_heartbeat_extends_the_lease_and_only_the_owner_may_finish(queue, clock):
+    job_id = queue.enqueue("scheduled_analysis")
+    queue.lease("worker-1")
+
+    clock.value += 50
+    assert queue.heartbeat(job_id, "worker-1")
+    assert not queue.heartbeat(job_id, "worker-2")
+    clock.value += 50  # past the original lease, within the renewed one
+    assert queue.lease("worker-2") is None
+
+    assert not queue.complete(job_id, "worker-2")
+    assert queue.complete(job_id, "worker-1", {"ok": True})
+    assert queue.get(job_id)["result"] == {"ok": True}
+    assert not queue.heartbeat(job_id, "worker-1")
+
+
+def test_expired_lease_is_reclaimed_by_another_worker(queue, clock):
+    job_id = queue.enqueue("scheduled_analysis")
+    queue.lease("worker-1")
+
+    clock.value += 61
+    job = queue.lease("worker-2")
+    assert (job["id"], job["lease_owner"], job["attempts"]) == (job_id, "worker-2", 2)
+
+    # The first worker's late result no longer counts.
+    assert not queue.complete(job_id, "worker-1")
+    assert not queue.fail(job_id, "worker-1", "late")
+
+
+def test_failed_attempts_back_off_exponentially_until_max_attempts(queue, clock):
+    job_id = queue.enqueue("scheduled_analysis")
+
+    for attempt, backoff in [(1, 10), (2, 20)]:
+        assert queue.lease("worker-1")["attempts"] == attempt
+        assert queue.fail(job_id, "worker-1", f"boom {attempt}")
+        job = queue.get(job_id)
+        assert (job["status"], job["error"], job["available_at"]) == ("queued", f"boom {attempt}", clock.value + backoff)
+
+        clock.value += backoff - 1
+        assert queue.lease("worker-1") is None
+        clock.value += 1
+
+    assert queue.lease("worker-1")["attempts"] == 3
+    assert queue.fail(job_id, "worker-1", "boom 3")
+    assert queue.get(job_id)["status"] == "failed"
+    assert queue.lease("worker-1") is None
+
+
+def test_expired_lease_on_last_attempt_fails_the_job(queue, clock):
+    job_id = queue.enqueue("scheduled_analysis")
+    for _ in range(3):
+        assert queue.lease("worker-1") is not None
+        clock.value += 61
+
+    assert queue.lease("worker-2") is None
+    job = queue.get(job_id)
+    assert (job["status"], job["error"]) == ("failed", "Lease expired before the job finished.")
@@ -0,0 +1,27 @@
+# tests/test_loadtest.py
+# Checks the latency statistics the load test reports.
+#
+# Usage: python -m pytest -q
+
+import pytest
+
+from loadtest.run import percentile
+
+
+@pytest.mark.parametrize("values, pct, expected", [
+    (range(1, 101), 50, 50),
+    (range(1, 101), 95, 95),
+    (range(1, 101), 99, 99),
+    (range(1, 101), 100, 100),
+    (range(1, 101), 7, 7),
+    (range(1, 11), 50, 5),
+    (range(1, 11), 95, 10),
+    ([3.0], 99, 3.0),
+    ([5, 1, 4, 2, 3], 0, 1),
+])
+def test_percentile_uses_nearest_rank(values, pct, expected):
+    assert percentile(list(values), pct) == expected
+
+
+def test_percentile_of_no_values_is_zero():
+    assert percentile([], 95) == 0.0
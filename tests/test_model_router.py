@@ -0,0 +1,23 @@
+# tests/test_model_router.py
+# Checks that ModelRouter aggregates latency and every kind of token usage per stage.
+#
+# Usage: python -m pytest -q
+
+from types import SimpleNamespace
+
+from model_router import ModelRouter
+
+
+def test_record_sums_thinking_and_total_tokens():
+    router = ModelRouter(routing={})
+    usage = SimpleNamespace(prompt_token_count=100, candidates_token_count=20, thoughts_token_count=300, total_token_count=420)
+    router.record("strategy", "gemini-2.5-flash", 0.5, usage)
+    router.record("strategy", "gemini-2.5-flash", 1.5, usage)
+    # Older responses without thinking fields still count.
+    router.record("strategy", "gemini-2.5-flash", 1.0, SimpleNamespace(prompt_token_count=10, candidates_token_count=5))
+
+    entry = router.stats()["strategy:gemini-2.5-flash"]
+    assert entry["calls"] == 3
+    assert (entry["prompt_tokens"], entry["output_tokens"]) == (210, 45)
+    assert (entry["thoughts_tokens"], entry["total_tokens"]) == (600, 840)
+    assert entry["max_latency_s"] == 1.5 and entry["avg_latency_s"] == 1.0
@@ -0,0 +1,118 @@
+# tests/test_report_store.py
+# Exercises ReportStore's delta writes, skips, deletes and retries against the in-memory Firestore fake.
+#
+# Usage: python -m pytest -q
+
+import json
+import time
+from types import SimpleNamespace
+
+import report_store
+from loadtest.fakes import FakeFirestoreClient
+from report_store import ReportStore
+
+
+def make_report(*trends) -> str:
+    return json.dumps({"trends": [{"id": trend_id, "name": trend_id.title(), "importance": importance}
+                                  for trend_id, importance in trends]})
+
+
+def test_save_writes_only_changed_trends_and_deletes_removed_ones():
+    db = FakeFirestoreClient()
+    store = ReportStore(db)
+
+    stats = store.save(make_report(("agents", 9), ("robotics", 7), ("chips", 5)))
+    assert stats["written"] == 3 and stats["deleted"] == 0 and not stats["skipped"]
+
+    writes_before = db.writes
+    stats = store.save(make_report(("agents", 9), ("robotics", 8)))
+    assert (stats["written"], stats["deleted"], stats["unchanged"]) == (1, 1, 1)
+    # One changed trend, one delete and the index.
+    assert db.writes - writes_before == 3
+
+    assert store.load_index()["trend_ids"] == ["agents", "robotics"]
+    assert store.load_trend("chips") is None
+    assert store.load() == json.loads(make_report(("agents", 9), ("robotics", 8)))
+
+
+def test_save_skips_unchanged_report():
+    db = FakeFirestoreClient()
+    store = ReportStore(db)
+    store.save(make_report(("agents", 9)))
+
+    writes_before = db.writes
+    stats = store.save(make_report(("agents", 9)))
+    assert stats["skipped"] and stats["unchanged"] == 1
+    assert db.writes == writes_before
+
+
+def test_save_recomputes_delta_when_index_changes_during_transaction():
+    class RacingClient(FakeFirestoreClient):
+        """Lets another saver commit right after the first index read of a transaction."""
+        raced = False
+
+        def _get(self, path):
+            snapshot = super()._get(path)
+            if path == "reports/latest" and not self.raced:
+                self.raced = True
+                ReportStore(self).save(make_report(("agents", 1), ("chips", 5)))
+            return snapshot
+
+    db = RacingClient()
+    store = ReportStore(db)
+    stats = store.save(make_report(("agents", 9)))
+
+    # The retried attempt saw the racing report, so it deletes its extra trend.
+    assert stats["deleted"] == 1
+    assert store.load() == json.loads(make_report(("agents", 9)))
+    assert store.load_index()["trend_hashes"].keys() == {"agents"}
+
+
+def test_save_async_retries_failed_writes_and_records_outcome(tmp_path, monkeypatch):
+    class FlakyClient(FakeFirestoreClient):
+        failures = 2
+
+        def _commit(self, ops, expected_versions=None):
+            if self.failures:
+                self.failures -= 1
+                raise RuntimeError("Firestore unavailable")
+            super()._commit(ops, expected_versions)
+
+    monkeypatch.setattr(report_store, "time", SimpleNamespace(sleep=lambda seconds: None))
+    spool_path = tmp_path / "pending_report.json"
+    db = FlakyClient()
+    store = ReportStore(db, spool_path=str(spool_path))
+
+    store.save_async(make_report(("agents", 9)))
+    assert store.flush(timeout=5)
+    assert store.last_outcome["status"] == "saved" and store.last_outcome["written"] == 1
+    assert db.failures == 0
+    assert not spool_path.exists()
+    assert store.load_index()["trend_ids"] == ["agents"]
+
+
+def test_save_async_discards_invalid_report(tmp_path):
+    spool_path = tmp_path / "pending_report.json"
+    store = ReportStore(FakeFirestoreClient(), spool_path=str(spool_path))
+
+    store.save_async("not json")
+    assert store.flush(timeout=5)
+    assert store.last_outcome["status"] == "discarded"
+    assert not spool_path.exists()
+    assert store.load_index() is None
+
+
+def test_resolve_persistence_follows_the_index():
+    store = ReportStore(FakeFirestoreClient())
+    report = make_report(("agents", 9))
+    pending = {"status": "pending", "report_hash": store.report_hash(report)}
+    finished_at = time.time()
+
+    assert store.resolve_persistence(pending, finished_at) == pending
+    store.save(report)
+    assert store.resolve_persistence(pending, finished_at)["status"] == "saved"
+    store.save(make_report(("robotics", 7)))
+    assert store.resolve_persistence(pending, finished_at)["status"] == "superseded"
+
+    discarded = {"status": "discarded", "error": "Report is not valid JSON"}
+    assert store.resolve_persistence(discarded, finished_at) == discarded
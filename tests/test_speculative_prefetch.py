@@ -0,0 +1,36 @@
+# tests/test_speculative_prefetch.py
+# Checks which regenerated scout queries may reuse a prefetched query's results.
+#
+# Usage: python -m pytest -q
+
+import pytest
+
+from agents.speculative_prefetch import match_query, normalize_query
+
+
+@pytest.mark.parametrize("query, prior", [
+    ('"solid-state batteries" AND funding', '"solid-state batteries" AND funding'),
+    ('1. "Solid-State Batteries"  AND funding', '"solid-state batteries" AND funding'),
+    ("- cat:cs.AI AND autonomous agents", "cat:cs.AI AND autonomous agent"),
+    ("language:python stars:>100 agent frameworks", "language:python stars:>100 agent framework"),
+    ("-crypto +AI hardware startups", "-crypto +AI hardware startup"),
+])
+def test_cosmetic_differences_match(query, prior):
+    assert match_query(query, ["unrelated query", prior]) == prior
+
+
+@pytest.mark.parametrize("query, prior", [
+    ('"solid-state batteries" AND funding', '"solid-state batteries" OR funding'),
+    ('"solid-state batteries" AND startup', '"solid-state batteries" NOT startup'),
+    ("cat:cs.AI AND autonomous agents", "all:cs.AI AND autonomous agents"),
+    ("self-driving labs AND materials", "self-driving labs ANDNOT materials"),
+    ("-crypto AI hardware startups", "+crypto AI hardware startups"),
+    ("AI hardware startups", "-AI hardware startups"),
+])
+def test_different_query_structure_does_not_match(query, prior):
+    assert match_query(query, [prior]) is None
+
+
+def test_normalize_query_strips_bullets_but_keeps_exclusions():
+    assert normalize_query("- Agent Frameworks") == "agent frameworks"
+    assert normalize_query("-crypto startups") == "-crypto startups"
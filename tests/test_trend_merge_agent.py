@@ -0,0 +1,100 @@
+# tests/test_trend_merge_agent.py
+# Pins how scout output is parsed and how candidates are grouped, scored and ranked.
+#
+# Usage: python -m pytest -q
+
+import json
+
+from agents.trend_merge_agent import TrendMergeAgent, parse_scout_output, scout_report
+from config import MERGE_SIMILARITY_THRESHOLD
+
+
+def candidate(source, name, description, evidence, strength):
+    return {"name": name, "description": description, "evidence": evidence, "strength": strength, "source": source}
+
+
+SCOUT_REPORTS = [
+    scout_report("news", "News summary", [
+        candidate("news", "Self-driving labs", "Robotic labs run materials experiments autonomously.",
+                  ["robotic materials lab raises funding"], 8),
+        candidate("news", "Agent orchestration", "Startups selling orchestration for AI agents.",
+                  ["agent orchestration startup funding"], 5),
+    ]),
+    scout_report("github", "GitHub summary", [
+        candidate("github", "Agent orchestration frameworks", "Libraries for coordinating multiple agents.",
+                  ["multi-agent orchestration framework"], 6),
+    ]),
+    scout_report("arxiv", "arXiv summary", [
+        candidate("arxiv", "Self-driving lab", "Autonomous lab for materials discovery.",
+                  ["self-driving lab materials discovery paper"], 7),
+        candidate("arxiv", "Neuromorphic chips", "Spiking hardware for low-power inference.",
+                  ["neuromorphic chip benchmark"], 9),
+    ]),
+]
+
+
+def test_parse_scout_output_falls_back_to_text_for_invalid_json():
+    assert parse_scout_output("news", "Not JSON at all") == scout_report("news", "Not JSON at all")
+    assert parse_scout_output("news", "[1, 2]") == scout_report("news", "[1, 2]")
+
+
+def test_parse_scout_output_cleans_candidates():
+    response = "```json\n" + json.dumps({
+        "summary": " Signals ",
+        "trends": [
+            {"name": " Too strong ", "strength": 15, "evidence": "single item"},
+            {"name": "Too weak", "strength": 0, "evidence": ["a", " ", "b"]},
+            {"name": "Not a number", "strength": "high"},
+            {"name": "  ", "strength": 5},
+            "not a dict",
+        ],
+    }) + "\n```"
+    report = parse_scout_output("github", response)
+
+    assert report["summary"] == "Signals"
+    assert [(c["name"], c["strength"], c["evidence"]) for c in report["candidates"]] == [
+        ("Too strong", 10, ["single item"]),
+        ("Too weak", 1, ["a", "b"]),
+        ("Not a number", 5, []),
+    ]
+    assert {c["source"] for c in report["candidates"]} == {"github"}
+
+
+def test_overlapping_candidates_merge_and_rank_by_corroboration_then_strength():
+    result = TrendMergeAgent(similarity_threshold=MERGE_SIMILARITY_THRESHOLD).execute(SCOUT_REPORTS)
+
+    assert [(c["name"], c["sources"], c["corroboration"], c["score"]) for c in result["candidates"]] == [
+        ("Self-driving labs", ["arxiv", "news"], 0.67, 0.733),
+        ("Agent orchestration frameworks", ["github", "news"], 0.67, 0.633),
+        ("Neuromorphic chips", ["arxiv"], 0.33, 0.617),
+    ]
+    labs = result["candidates"][0]
+    assert labs["also_known_as"] == ["Self-driving lab"]
+    assert labs["evidence"] == [
+        "[news] robotic materials lab raises funding",
+        "[arxiv] self-driving lab materials discovery paper",
+    ]
+    assert result["fallback_reports"] == []
+
+
+def test_unrelated_candidates_stay_separate():
+    result = TrendMergeAgent(similarity_threshold=0.7).execute(SCOUT_REPORTS)
+    assert len(result["candidates"]) == 5
+    assert all(len(c["sources"]) == 1 for c in result["candidates"])
+
+
+def test_corroboration_counts_scouts_without_candidates():
+    reports = [
+        SCOUT_REPORTS[2],
+        scout_report("news", "News had no structured output"),
+        scout_report("github", ""),
+    ]
+    result = TrendMergeAgent().execute(reports)
+
+    assert {c["corroboration"] for c in result["candidates"]} == {0.33}
+    assert result["fallback_reports"] == ["News had no structured output"]
+
+
+def test_merge_is_deterministic_for_reordered_input():
+    agent = TrendMergeAgent()
+    assert agent.execute(SCOUT_REPORTS) == agent.execute(list(reversed(SCOUT_REPORTS)))
@@ -0,0 +1,91 @@
+# tests/test_worker.py
+# Checks that a Worker keeps its job's lease alive and stops short of saving once the lease is lost.
+#
+# Usage: python -m pytest -q
+
+import json
+import time
+
+from job_queue import JobQueue
+from report_store import content_hash
+from worker import SCHEDULED_ANALYSIS, Worker
+
+
+class FakeOrchestrator:
+    def __init__(self, during_run=None, report=json.dumps({"trends": []})):
+        self.during_run = during_run
+        self.report = report
+
+    def run(self, profile=False):
+        if self.during_run:
+            self.during_run()
+        return self.report
+
+
+class FakeReportStore:
+    def __init__(self):
+        self.saved = []
+
+    def report_hash(self, final_report_json_str):
+        return content_hash(json.loads(final_report_json_str))
+
+    def save_async(self, final_report_json_str):
+        self.saved.append(final_report_json_str)
+
+
+def test_heartbeat_follows_the_queue_lease(tmp_path):
+    queue = JobQueue(str(tmp_path / "jobs.sqlite3"), lease_seconds=0.3)
+    job_id = queue.enqueue(SCHEDULED_ANALYSIS)
+    stolen = []
+
+    def slow_run():
+        # Three lease periods; without renewals another worker would reclaim the job.
+        for _ in range(9):
+            time.sleep(0.1)
+            stolen.append(queue.lease("other-worker"))
+
+    store = FakeReportStore()
+    assert Worker("worker-1", queue, FakeOrchestrator(slow_run), store).run_once()
+
+    assert not any(stolen)
+    assert queue.get(job_id)["status"] == "succeeded"
+    assert len(store.saved) == 1
+
+
+def test_lost_lease_skips_the_save_and_leaves_the_job_to_its_new_owner(tmp_path):
+    queue = JobQueue(str(tmp_path / "jobs.sqlite3"))
+    job_id = queue.enqueue(SCHEDULED_ANALYSIS)
+
+    def lose_lease():
+        with queue._connect() as conn:
+            conn.execute("UPDATE jobs SET lease_expires = 0 WHERE id = ?", (job_id,))
+        assert queue.lease("other-worker")["id"] == job_id
+
+    store = FakeReportStore()
+    assert Worker("worker-1", queue, FakeOrchestrator(lose_lease), store).run_once()
+
+    assert store.saved == []
+    job = queue.get(job_id)
+    assert (job["status"], job["lease_owner"], job["attempts"]) == ("running", "other-worker", 2)
+
+
+def test_job_finishes_without_waiting_for_the_report_write(tmp_path):
+    queue = JobQueue(str(tmp_path / "jobs.sqlite3"))
+    job_id = queue.enqueue(SCHEDULED_ANALYSIS)
+    store = FakeReportStore()
+    Worker("worker-1", queue, FakeOrchestrator(), store).run_once()
+
+    result = queue.get(job_id)["result"]
+    assert result["persistence"] == {"status": "pending", "report_hash": store.report_hash(store.saved[0])}
+
+
+def test_invalid_report_is_recorded_as_discarded_without_rerunning_the_job(tmp_path):
+    queue = JobQueue(str(tmp_path / "jobs.sqlite3"))
+    job_id = queue.enqueue(SCHEDULED_ANALYSIS)
+    store = FakeReportStore()
+    Worker("worker-1", queue, FakeOrchestrator(report="not json"), store).run_once()
+
+    job = queue.get(job_id)
+    assert (job["status"], job["attempts"]) == ("succeeded", 1)
+    assert job["result"]["persistence"]["status"] == "discarded"
+    assert store.saved == []
@@ -0,0 +1,158 @@
+# worker.py
+# Worker processes that consume the job queue and run the analysis pipeline outside the API.
+#
+# Usage: python worker.py --workers 2
+
+import argparse
+import json
+import multiprocessing
+import os
+import socket
+import threading
+import time
+import traceback
+from google.cloud import firestore
+from job_queue import JobQueue
+from report_store import ReportStore
+from config import JOB_MAX_CONCURRENCY, JOB_WORKERS, REPORT_SPOOL_PATH
+
+SCHEDULED_ANALYSIS = "scheduled_analysis"
+
+
+class LeaseLostError(Exception):
+    """The worker no longer holds the lease on its job; another worker may be running it."""
+
+
+class Worker:
+    """
+    Leases jobs from the queue one at a time, keeps the lease alive while the
+    job runs and records the outcome. Crashed workers are recovered by lease expiry.
+    """
+    def __init__(
+        self,
+        worker_id: str,
+        queue: JobQueue,
+        orchestrator,
+        report_store: ReportStore,
+        max_running: int = JOB_MAX_CONCURRENCY
+    ):
+        self.worker_id = worker_id
+        self.queue = queue
+        self.orchestrator = orchestrator
+        self.report_store = report_store
+        self.max_running = max_running
+        self.current_job = None
+        self.handlers = {SCHEDULED_ANALYSIS: self.run_scheduled_analysis}
+
+    def ensure_lease(self):
+        """Renews the lease on the current job; raises LeaseLostError if it was lost."""
+        if not self.queue.heartbeat(self.current_job["id"], self.worker_id):
+            raise LeaseLostError(f"Lost the lease on job {self.current_job['id']}.")
+
+    def run_scheduled_analysis(self, payload: dict) -> dict:
+        final_report_json_str = self.orchestrator.run(profile=payload.get("profile", False))
+        # If the job was reclaimed meanwhile, its new owner saves the report instead.
+        self.ensure_lease()
+        try:
+            report_hash = self.report_store.report_hash(final_report_json_str)
+        except json.JSONDecodeError as e:
+            persistence = {"status": "discarded", "error": f"Report is not valid JSON: {e}"}
+        else:
+            # Written to Firestore in the background (and spooled locally, so it survives a restart).
+            # /jobs/{id} reports it as saved once the report index carries this report_hash.
+            self.report_store.save_async(final_report_json_str)
+            persistence = {"status": "pending", "report_hash": report_hash}
+        return {"report_bytes": len(final_report_json_str), "persistence": persistence}
+
+    def run_once(self) -> bool:
+        """Runs the next available job. Returns False if there was nothing to do."""
+        job = self.queue.lease(self.worker_id, max_running=self.max_running)
+        if job is None:
+            return False
+
+        print(f"[{self.worker_id}] Running job {job['id']} ({job['kind']}, attempt {job['attempts']}/{job['max_attempts']})...")
+        self.current_job = job
+        stop_heartbeat = threading.Event()
+        heartbeat = threading.Thread(target=self._heartbeat, args=(job["id"], stop_heartbeat), daemon=True)
+        heartbeat.start()
+        try:
+            handler = self.handlers.get(job["kind"])
+            if handler is None:
+                raise ValueError(f"Unknown job kind '{job['kind']}'.")
+            result = handler(job["payload"])
+            if self.queue.complete(job["id"], self.worker_id, result):
+                print(f"[{self.worker_id}] Job {job['id']} succeeded.")
+            else:
+                print(f"[{self.worker_id}] Job {job['id']} finished after its lease was lost. Result discarded.")
+        except LeaseLostError as e:
+            print(f"[{self.worker_id}] {e} Abandoning the job to its new owner.")
+        except Exception as e:
+            traceback.print_exc()
+            if self.queue.fail(job["id"], self.worker_id, str(e)):
+                print(f"[{self.worker_id}] Job {job['id']} failed: {e}")
+            else:
+                print(f"[{self.worker_id}] Job {job['id']} failed after its lease was lost: {e}")
+        finally:
+            stop_heartbeat.set()
+            heartbeat.join()
+            self.current_job = None
+        return True
+
+    def run_forever(self, poll_interval: float = 2.0):
+        print(f"[{self.worker_id}] Waiting for jobs...")
+        while True:
+            if not self.run_once():
+                time.sleep(poll_interval)
+
+    def _heartbeat(self, job_id: str, stop: threading.Event):
+        # Renew well before the lease runs out so a slow pipeline is not reclaimed.
+        while not stop.wait(self.queue.lease_seconds / 3):
+            if not self.queue.heartbeat(job_id, self.worker_id):
+                print(f"[{self.worker_id}] Lost the lease on job {job_id}.")
+                return
+
+
+def worker_process(index: int, poll_interval: float):
+    """Entry point of one worker process: initializes its own clients and consumes the queue."""
+    # Imported here so each spawned process initializes Vertex AI on its own.
+    from main import initialize_system, build_orchestrator
+
+    worker_id = f"{socket.gethostname()}-{os.getpid()}-{index}"
+    orchestrator = build_orchestrator(initialize_system())
+    # One spool file per worker slot, so a restarted worker resumes its own unsaved report.
+    report_store = ReportStore(firestore.Client(), spool_path=f"{REPORT_SPOOL_PATH}.{index}")
+    Worker(worker_id, JobQueue(), orchestrator, report_store).run_forever(poll_interval)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run worker processes that consume the analysis job queue.")
+    parser.add_argument("--workers", type=int, default=JOB_WORKERS, help="Number of worker processes.")
+    parser.add_argument("--poll-interval", type=float, default=2.0, help="Seconds to wait when the queue is empty.")
+    args = parser.parse_args()
+
+    # 'spawn' gives every worker fresh gRPC/Vertex AI state instead of forked copies.
+    context = multiprocessing.get_context("spawn")
+    processes = {}
+    print(f"Starting {args.workers} worker process(es)...")
+    try:
+        while True:
+            # Start missing workers and restart any that crashed; their jobs are reclaimed by lease expiry.
+            for index in range(args.workers):
+                process = processes.get(index)
+                if process is None or not process.is_alive():
+                    if process is not None:
+                        print(f"Worker {index} exited with code {process.exitcode}. Restarting...")
+                    process = context.Process(target=worker_process, args=(index, args.poll_interval), daemon=True)
+                    process.start()
+                    processes[index] = process
+            time.sleep(5)
+    except KeyboardInterrupt:
+        print("Shutting down workers...")
+        for process in processes.values():
+            process.terminate()
+        for process in processes.values():
+            process.join()
+
+
+if __name__ == "__main__":
+    main()